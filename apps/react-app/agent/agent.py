@@ -14,6 +14,7 @@ import os
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import AsyncGenerator, Optional
 from uuid import uuid4
@@ -34,19 +35,23 @@ logger = logging.getLogger(__name__)
 _app_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_app_root))
 
-from agent.responses_agent import WrappedAgent
+from agent.responses_agent import WrappedAgent, process_agent_astream_events
 from agent.utils import (
     get_secret,
     init_workspace_client,
     build_mcp_list,
+    get_embeddings,
+    get_uc_function_tools,
     _collect_tool_metadata,
     _load_mcp_tools_individually,
+    load_mcp_tools,
+    use_pooled_mcp_http,
     _keepalive_loop,
     _touch_activity,
     _warmup,
     _log_exception_group,
     _run_mcp_loop,
-    _mcp_run,
+    _tool_server_map,
     wrap_mcp_tools_with_resilience,
 )
 from agent.utils_memory import memory_write_tools
@@ -85,6 +90,8 @@ def _build_genie_tool(agent_name, genie_config, ws_client, StructuredTool, Genie
         f"Text-to-SQL via Genie. Translates a natural-language question into SQL "
         f"and queries the `{table}` table. Use for questions about {agent_name} data."
     )
+    if genie_config.get("description"):
+        description = f"{description} {genie_config['description']}"
 
     def _run(question: str) -> str:
         resp = genie.ask_question(question)
@@ -104,6 +111,46 @@ def _build_genie_tool(agent_name, genie_config, ws_client, StructuredTool, Genie
     )
 
 
+# Maps the ASCII digits of an ECFP bitstring to raw 0/1 byte values.
+_BITSTRING_TO_BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _build_vectorinput_tool(retriever_tool, retriever_config, uc_fn_client, tool):
+    """Wrap a vector index as a SMILES -> ECFP4 similarity-search tool.
+
+    The vector store handle, ``k`` and text column are bound once here so
+    each call skips the config/attribute lookups, and each retriever in the
+    build loop gets its own store rather than the loop's last one.
+    """
+    vector_store = retriever_tool._vector_store
+    k = retriever_config["k"]
+    text_column = retriever_config["text_column"]
+
+    @tool
+    def tool_vectorinput(smiles: str):
+        """
+        Search for similar molecules based on their ECFP4 molecular fingerprints embedding
+        vector (list of int). Required input (bitstring) is a 1024-char bitstring
+        (e.g. 1011..00) which is the concatenated string form of a list of 1024 integers.
+        """
+        bitstring = uc_fn_client.execute_function(
+            function_name="healthcare_lifesciences.qsar.get_embedding",
+            parameters={"smiles": smiles}
+        )
+        # get_embedding reports bad SMILES as an "ERROR: ..." string (which may echo
+        # non-ASCII input); translating that would send a short garbage vector to the
+        # index instead of the message, so check the str before encoding it
+        if bitstring.value.strip("01"):
+            return bitstring.value
+        raw = bitstring.value.encode("ascii")
+        # Bytes -> 0/1 bytes -> list[int] in C; the VS client JSON-encodes a list anyway
+        query_vector = list(raw.translate(_BITSTRING_TO_BITS))
+        docs = vector_store.similarity_search_by_vector(query_vector, k=k)
+        return [{**doc.metadata, text_column: doc.page_content} for doc in docs]
+
+    return tool_vectorinput
+
+
 def _make_runtime_cfg(llm_endpoint: str | None, enabled_mcps: list[str] | None) -> dict:
     """Return a deep copy of _cfg patched with the given runtime overrides."""
     import copy
@@ -129,6 +176,7 @@ mcp_client = None
 _agent_ready = threading.Event()
 _agent_build_error: Optional[str] = None
 _current_cfg: dict = {}   # mirrors _cfg but updated on each rebuild
+_debug_compiled: Optional[tuple] = None   # (workflow, checkpointer-less compiled graph)
 
 
 def get_current_config() -> dict:
@@ -190,7 +238,7 @@ def _build_agent(cfg: dict) -> StateGraph:
     # nest_asyncio.apply()
 
     from databricks.sdk import WorkspaceClient
-    from databricks_langchain import ChatDatabricks, DatabricksEmbeddings
+    from databricks_langchain import ChatDatabricks
     from databricks_langchain import (
         DatabricksMultiServerMCPClient,
         DatabricksMCPServer,
@@ -198,14 +246,27 @@ def _build_agent(cfg: dict) -> StateGraph:
     )
     from databricks_langchain import VectorSearchRetrieverTool
     from databricks_ai_bridge.genie import Genie
-    from databricks_langchain.uc_ai import UCFunctionToolkit
     from langchain.agents import create_agent
     from langchain.tools import tool
     from langchain_core.tools import StructuredTool
-    from langgraph_supervisor import create_supervisor
+    from langgraph_supervisor import create_handoff_tool, create_supervisor
     from unitycatalog.ai.core.databricks import DatabricksFunctionClient
 
     ws_client = init_workspace_client(cfg)
+
+    # --- MCP bring-up (PubChem / PubMed / OpenTargets) ---
+    # Started first so the MCP handshakes overlap with the LLM / UC / Genie /
+    # vector search setup below; the result is collected at the MCP agent.
+    servers = build_mcp_list(cfg, ws_client=ws_client)
+
+    global mcp_client
+    mcp_client = use_pooled_mcp_http(DatabricksMultiServerMCPClient(servers))
+    prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-prefetch")
+    mcp_future = prefetch.submit(
+        load_mcp_tools, mcp_client, servers, server_map=_tool_server_map
+    )
+    prefetch.shutdown(wait=False)
+
     uc_fn_client = DatabricksFunctionClient()
 
     llm = ChatDatabricks(endpoint=cfg["llm_endpoint"])
@@ -213,7 +274,7 @@ def _build_agent(cfg: dict) -> StateGraph:
     # --- Utility functions agent ---
     function_agents = []
     for agent_name, functions in cfg["uc_functions"].items():
-        tools = UCFunctionToolkit(function_names=functions).tools
+        tools = list(get_uc_function_tools(tuple(functions)))
         function_agent = create_agent(
             llm,
             tools=tools,
@@ -240,54 +301,34 @@ def _build_agent(cfg: dict) -> StateGraph:
             text_column=retriever_config["text_column"],
             tool_name=agent_name,
             tool_description=retriever_config["tool_description"],
-            embedding=DatabricksEmbeddings(endpoint=retriever_config["embedding"]),
+            embedding=get_embeddings(retriever_config["embedding"]),
             workspace_client=init_workspace_client(cfg, SP=True),
         )
 
         if retriever_config["search_type"] == "vector":
             # only needed if non-text embeddings
-            @tool
-            def tool_vectorinput(smiles: str):
-                """
-                Search for similar molecules based on their ECFP4 molecular fingerprints embedding
-                vector (list of int). Required input (bitstring) is a 1024-char bitstring
-                (e.g. 1011..00) which is the concatenated string form of a list of 1024 integers.
-                """
-                bitstring = uc_fn_client.execute_function(
-                    function_name="healthcare_lifesciences.qsar.get_embedding",
-                    parameters={"smiles": smiles}
-                )
-                query_vector = [int(c) for c in bitstring.value]
-                docs = retriever_tool._vector_store.similarity_search_by_vector(
-                    query_vector, k=retriever_config["k"]
-                )
-                return [doc.metadata | {retriever_config["text_column"]: doc.page_content} for doc in docs]
-                
-            tool = [tool_vectorinput]
+            retriever_tools = [
+                _build_vectorinput_tool(retriever_tool, retriever_config, uc_fn_client, tool)
+            ]
         else:
-            tool = [retriever_tool]
+            retriever_tools = [retriever_tool]
 
         retreiver_agent = create_agent(
             llm,
-            tools=[tool_vectorinput],
+            tools=retriever_tools,
             system_prompt=cfg["prompts"][agent_name],
             name=agent_name,
         )
         retriever_agents.append(retreiver_agent)
 
     # --- MCP agents (PubChem / PubMed / OpenTargets) ---
-    servers = build_mcp_list(cfg, ws_client=ws_client)
-
-    global mcp_client
-    mcp_client = DatabricksMultiServerMCPClient(servers)
     try:
-        mcp_tools = _mcp_run(mcp_client.get_tools())
-        logger.info("MCP tools loaded: %d tools", len(mcp_tools))
+        mcp_tools = mcp_future.result()
     except BaseException as exc:
         server_names = ", ".join(s.name for s in servers)
         _log_exception_group(exc, server_names=server_names)
         logger.warning("Batch MCP loading failed for [%s] — trying servers individually…", server_names)
-        mcp_tools = _load_mcp_tools_individually(servers)
+        mcp_tools = _load_mcp_tools_individually(servers, server_map=_tool_server_map)
     
     # exclude tools that are overly verbose or unimplemented
     _EXCLUDED_MCP_TOOLS = set(cfg.get("blacklisted_tools", []))
@@ -312,10 +353,28 @@ def _build_agent(cfg: dict) -> StateGraph:
     _agent_tools = _collect_tool_metadata(mcp_tools, cfg)
 
     # --- Supervisor ---
+    # Each agent's capabilities ride on its handoff tool description rather than
+    # being restated in the supervisor prompt. Config-section agents (genie,
+    # retriever, uc_functions) disabled by a rebuild drop out with their tool; the
+    # always-built mcp agent instead names the MCP servers it was built with.
+    agents = [mcp_agent, mem_agent] + function_agents + retriever_agents
+    handoff_descriptions = dict(cfg.get("handoff_descriptions", {}))
+    if "mcp" in handoff_descriptions:
+        handoff_descriptions["mcp"] = handoff_descriptions["mcp"].format(
+            servers=", ".join(s.name for s in servers) or "none"
+        )
+    handoff_tools = [
+        create_handoff_tool(
+            agent_name=agent.name,
+            description=handoff_descriptions.get(agent.name),
+            add_handoff_messages=False,
+        )
+        for agent in agents
+    ]
     workflow = create_supervisor(
-        [mcp_agent, mem_agent] + function_agents + retriever_agents,
+        agents,
         model=llm,
-        tools=genie_tools,
+        tools=genie_tools + handoff_tools,
         prompt=cfg["prompts"]["supervisor"],
         output_mode="last_message",
         add_handoff_messages=False,
@@ -419,13 +478,14 @@ async def predict_stream_raw(
 ) -> AsyncGenerator[ResponsesAgentStreamEvent, None]:
     """Simple debug stream directly from the LangGraph workflow using astream.
 
-    Compiles the workflow without a checkpointer (no Lakebase memory) and
-    prints each chunk to stdout for inspection.
+    Compiles the workflow without a checkpointer (no Lakebase memory), streams
+    token deltas and tool events as they arrive (same conversion as
+    WrappedAgent) and prints each event to stdout for inspection.
     """
     await _wait_for_agent()
 
-    cc_msgs = to_chat_completions_input([i.model_dump() for i in request.input])
-    ci = dict(request.custom_inputs or {})
+    cc_msgs = to_chat_completions_input([i.model_dump(exclude_none=True) for i in request.input])
+    ci = request.custom_inputs or {}
     thread_id = ci.get("thread_id", str(uuid4()))
     user_id = ci.get("user_id")
     inputs = {"messages": cc_msgs}
@@ -434,6 +494,19 @@ async def predict_stream_raw(
         config = {"configurable": {"thread_id": thread_id, "user_id": user_id}}
         
 
-    async for chunk in _workflow.compile().astream(inputs, config=config):
-        print(chunk, flush=True)
-    yield ResponsesAgentStreamEvent(type="response.output_text.done")
+    global _debug_compiled
+    # Compile once per built workflow; a rebuild swaps _workflow and invalidates this
+    if _debug_compiled is None or _debug_compiled[0] is not _workflow:
+        _debug_compiled = (_workflow, _workflow.compile())
+    graph = _debug_compiled[1]
+
+    async for event in process_agent_astream_events(
+        graph.astream(
+            inputs,
+            config=config,
+            stream_mode=["updates", "messages"],
+            subgraphs=True,
+        )
+    ):
+        print(event, flush=True)
+        yield event
@@ -1,7 +1,12 @@
 import asyncio
 import json
 import logging
+import os
+import queue
+import threading
 import time as time_mod
+import weakref
+from contextlib import AsyncExitStack
 from typing import Any, AsyncGenerator, AsyncIterator, Generator, Optional
 from uuid import uuid4
 
@@ -23,6 +28,26 @@ from mlflow.types.responses import (
     to_chat_completions_input,
 )
 
+# uvloop only backs the private loop below; the server keeps the default policy
+# (see start_server.main), so the global policy is left alone
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
+
+# orjson (already installed with langsmith) serializes large tool outputs in C
+try:
+    import orjson
+    def _dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # e.g. non-str dict keys, which the stdlib encoder coerces
+            return json.dumps(obj)
+except ImportError:
+    _dumps = json.dumps
+
 try:
     import uuid_utils
     def _new_id() -> str:
@@ -32,7 +57,7 @@ except ImportError:
         return str(uuid4())
 
 from agent.utils_memory import get_user_id, fetch_user_memories, inject_memory_into_messages
-from agent.utils import _FAKE_ID_PREFIX, _disabled_mcps_ctx, _tool_server_map
+from agent.utils import _FAKE_ID_PREFIX, _default_workspace_client, _disabled_mcps_ctx, _tool_server_map
 
 # Config sections that define LangGraph sub-agents vs MCP data sources.
 # Used by _log_request_inventory() to label each enabled item.
@@ -40,6 +65,11 @@ _AGENT_CFG_SECTIONS = ("uc_functions", "genie", "retriever")
 _MCP_CFG_SECTIONS = ("external_mcp", "custom_mcp", "uc_connections")
 # Always-on built-in sub-agents (not driven by config sections).
 _BUILTIN_AGENTS = ("mcp", "memory")
+# LangGraph checkpoint durability. "exit" writes the thread's checkpoint once
+# when the turn finishes instead of after every supervisor/sub-agent step, so
+# Lakebase round-trips stay off the streaming path. Threads only resume
+# between turns, so the per-step checkpoints were never read back.
+_CHECKPOINT_DURABILITY = os.environ.get("CHECKPOINT_DURABILITY", "exit")
 
 
 def _extract_last_user_question(cc_msgs) -> str:
@@ -60,6 +90,17 @@ def _extract_last_user_question(cc_msgs) -> str:
     return ""
 
 
+def _content_text(content) -> str:
+    """Flatten message content to text; list content keeps every text block, in order."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, str) or (isinstance(part, dict) and part.get("type") == "text")
+    )
+
+
 def _log_request_inventory(cfg: dict, cc_msgs, enabled_mcps) -> None:
     """Print the user question and the enabled agents / MCP servers to stdout."""
     cfg = cfg or {}
@@ -85,6 +126,13 @@ def _log_request_inventory(cfg: dict, cc_msgs, enabled_mcps) -> None:
 
 logger = logging.getLogger(__name__)
 
+# Text token deltas are coalesced into one output_text.delta event once this many
+# chunks or characters are pending, or this many seconds have passed since the last
+# one. The first delta of each message goes out immediately.
+_DELTA_MAX_PARTS = 8
+_DELTA_MAX_CHARS = 256
+_DELTA_MAX_DELAY = 0.05
+
 async def process_agent_astream_events(
     async_stream: AsyncIterator[Any],
     seen_msg_ids: set[str] | None = None,
@@ -114,6 +162,26 @@ async def process_agent_astream_events(
     active_text_item_id: str | None = None
     active_text_content = ""
     active_tool_calls: dict[int, dict] = {}
+    pending_delta: list[str] = []
+    pending_chars = 0
+    last_delta_at = 0.0
+
+    def _flush_delta() -> ResponsesAgentStreamEvent | None:
+        nonlocal pending_chars, last_delta_at
+        if not pending_delta:
+            return None
+        delta = "".join(pending_delta)
+        pending_delta.clear()
+        pending_chars = 0
+        last_delta_at = time_mod.monotonic()
+        # Delta events are built from known-good fields on the hot path; skip validation
+        return ResponsesAgentStreamEvent.model_construct(
+            type="response.output_text.delta",
+            delta=delta,
+            item_id=active_text_item_id,
+            content_index=0,
+            output_index=output_index,
+        )
 
     def _response_obj(output: list[dict] | None = None) -> dict:
         return {
@@ -145,106 +213,113 @@ async def process_agent_astream_events(
             event = raw_event
 
         if event[0] == "messages":
-            try:
-                chunk = event[1][0]
-                if not isinstance(chunk, AIMessageChunk):
-                    continue
-
-                if not in_turn:
-                    _start_turn()
-                    yield ResponsesAgentStreamEvent(
-                        type="response.created",
-                        response=_response_obj(),
-                    )
-
-                if chunk.tool_call_chunks:
-                    for tc_chunk in chunk.tool_call_chunks:
-                        idx = tc_chunk.get("index", 0)
-                        name = tc_chunk.get("name") or ""
-                        tc_id = tc_chunk.get("id") or ""
-                        args = tc_chunk.get("args") or ""
-
-                        if idx not in active_tool_calls:
-                            item_id = _new_id()
-                            active_tool_calls[idx] = {
-                                "item_id": item_id,
-                                "name": name,
-                                "args": "",
-                                "call_id": tc_id,
-                                "output_index": output_index,
-                            }
-                            output_index += 1
-                            yield ResponsesAgentStreamEvent(
-                                type="response.output_item.added",
-                                item={
-                                    "type": "function_call",
-                                    "id": item_id,
-                                    "call_id": tc_id,
-                                    "name": name,
-                                    "arguments": "",
-                                },
-                                output_index=active_tool_calls[idx]["output_index"],
-                            )
-                        else:
-                            tc_info = active_tool_calls[idx]
-                            if name and not tc_info["name"]:
-                                tc_info["name"] = name
-                            if tc_id and not tc_info["call_id"]:
-                                tc_info["call_id"] = tc_id
-
-                        if args:
-                            active_tool_calls[idx]["args"] += args
-                            yield ResponsesAgentStreamEvent(
-                                type="response.function_call_arguments.delta",
-                                delta=args,
-                                item_id=active_tool_calls[idx]["item_id"],
-                                output_index=active_tool_calls[idx]["output_index"],
-                            )
-
-                elif chunk.content:
-                    content = chunk.content
-                    if not active_text_item_id:
-                        active_text_item_id = _new_id()
-                        active_text_content = ""
-                        if text_items_emitted > 0:
-                            content = "\n\n" + content
-                        text_items_emitted += 1
+            # (chunk, metadata); anything but an AI token chunk is skipped
+            chunk = event[1][0] if event[1] else None
+            if not isinstance(chunk, AIMessageChunk):
+                continue
+
+            if not in_turn:
+                _start_turn()
+                yield ResponsesAgentStreamEvent(
+                    type="response.created",
+                    response=_response_obj(),
+                )
+
+            if chunk.tool_call_chunks:
+                if flushed := _flush_delta():
+                    yield flushed
+                for tc_chunk in chunk.tool_call_chunks:
+                    idx = tc_chunk.get("index", 0)
+                    name = tc_chunk.get("name") or ""
+                    tc_id = tc_chunk.get("id") or ""
+                    args = tc_chunk.get("args") or ""
+
+                    if idx not in active_tool_calls:
+                        item_id = _new_id()
+                        active_tool_calls[idx] = {
+                            "item_id": item_id,
+                            "name": name,
+                            "args": "",
+                            "call_id": tc_id,
+                            "output_index": output_index,
+                        }
+                        output_index += 1
                         yield ResponsesAgentStreamEvent(
                             type="response.output_item.added",
                             item={
-                                "type": "message",
-                                "id": active_text_item_id,
-                                "role": "assistant",
-                                "status": "in_progress",
-                                "content": [],
+                                "type": "function_call",
+                                "id": item_id,
+                                "call_id": tc_id,
+                                "name": name,
+                                "arguments": "",
                             },
-                            output_index=output_index,
+                            output_index=active_tool_calls[idx]["output_index"],
                         )
-                        yield ResponsesAgentStreamEvent(
-                            type="response.content_part.added",
-                            item_id=active_text_item_id,
-                            output_index=output_index,
-                            content_index=0,
-                            part={"type": "output_text", "text": "", "annotations": []},
+                    else:
+                        tc_info = active_tool_calls[idx]
+                        if name and not tc_info["name"]:
+                            tc_info["name"] = name
+                        if tc_id and not tc_info["call_id"]:
+                            tc_info["call_id"] = tc_id
+
+                    if args:
+                        active_tool_calls[idx]["args"] += args
+                        yield ResponsesAgentStreamEvent.model_construct(
+                            type="response.function_call_arguments.delta",
+                            delta=args,
+                            item_id=active_tool_calls[idx]["item_id"],
+                            output_index=active_tool_calls[idx]["output_index"],
                         )
 
-                    active_text_content += content
+            elif chunk.content:
+                content = _content_text(chunk.content)
+                if not content:
+                    continue
+                first_delta = not active_text_item_id
+                if first_delta:
+                    active_text_item_id = _new_id()
+                    active_text_content = ""
+                    if text_items_emitted > 0:
+                        content = "\n\n" + content
+                    text_items_emitted += 1
+                    yield ResponsesAgentStreamEvent(
+                        type="response.output_item.added",
+                        item={
+                            "type": "message",
+                            "id": active_text_item_id,
+                            "role": "assistant",
+                            "status": "in_progress",
+                            "content": [],
+                        },
+                        output_index=output_index,
+                    )
                     yield ResponsesAgentStreamEvent(
-                        type="response.output_text.delta",
-                        delta=content,
+                        type="response.content_part.added",
                         item_id=active_text_item_id,
-                        content_index=0,
                         output_index=output_index,
+                        content_index=0,
+                        part={"type": "output_text", "text": "", "annotations": []},
                     )
 
-            except Exception as e:
-                logger.exception("Error processing agent stream event: %s", e)
+                active_text_content += content
+                pending_delta.append(content)
+                pending_chars += len(content)
+                if (
+                    first_delta
+                    or len(pending_delta) >= _DELTA_MAX_PARTS
+                    or pending_chars >= _DELTA_MAX_CHARS
+                    or time_mod.monotonic() - last_delta_at >= _DELTA_MAX_DELAY
+                ):
+                    yield _flush_delta()
 
         elif event[0] == "updates":
+            # pending text belongs to the message this update may complete
+            if flushed := _flush_delta():
+                yield flushed
             for node_data in event[1].values():
                 if not isinstance(node_data, dict):
                     continue
-                messages = node_data.get("messages", [])
+                messages = node_data.get("messages")
                 if not messages:
                     continue
 
@@ -259,11 +334,22 @@ async def process_agent_astream_events(
                 if not fresh_messages:
                     continue
 
+                # Serialize structured tool outputs off the event loop, all of this node's in
+                # one worker hop, so large payloads don't stall other requests' streams
+                structured = [
+                    m for m in fresh_messages
+                    if isinstance(m, ToolMessage) and not isinstance(m.content, str)
+                ]
+                tool_outputs: dict[int, str] = {}
+                if structured:
+                    dumped = await asyncio.to_thread(lambda: [_dumps(m.content) for m in structured])
+                    tool_outputs = {id(m): out for m, out in zip(structured, dumped)}
+
                 has_ai_message = False
 
                 for msg in fresh_messages:
                     if isinstance(msg, ToolMessage):
-                        content = msg.content if isinstance(msg.content, str) else json.dumps(msg.content)
+                        content = msg.content if isinstance(msg.content, str) else tool_outputs[id(msg)]
                         item = create_function_call_output_item(
                             call_id=msg.tool_call_id,
                             output=content,
@@ -286,7 +372,7 @@ async def process_agent_astream_events(
                             call_id = tc.get("id", "")
                             name = tc.get("name", "")
                             args = tc.get("args", {})
-                            args_str = json.dumps(args) if isinstance(args, dict) else str(args)
+                            args_str = _dumps(args) if isinstance(args, dict) else str(args)
 
                             tc_info = active_tool_calls.get(j)
                             if tc_info:
@@ -312,7 +398,7 @@ async def process_agent_astream_events(
 
                         active_tool_calls.clear()
 
-                    elif isinstance(msg, AIMessage) and msg.content:
+                    elif isinstance(msg, AIMessage) and (text := _content_text(msg.content)):
                         has_ai_message = True
                         if not in_turn:
                             _start_turn()
@@ -321,7 +407,6 @@ async def process_agent_astream_events(
                                 response=_response_obj(),
                             )
 
-                        text = msg.content
                         item_id = active_text_item_id or _new_id()
 
                         if not active_text_item_id:
@@ -374,6 +459,38 @@ async def process_agent_astream_events(
                     )
                     _end_turn()
 
+    if flushed := _flush_delta():
+        yield flushed
+
+
+# Open Lakebase store/checkpointer per event loop, keyed by
+# (project, branch, embedding endpoint, embedding dim, pool sizes). Shared across
+# WrappedAgent instances so agent rebuilds don't open fresh pools.
+_LAKEBASE_POOLS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Sync predict()/predict_stream() callers (e.g. /invocations runs predict() in an
+# executor thread) drive the async stream on this one background loop instead of
+# a loop per calling thread, so the Lakebase pools opened for them are shared.
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_STREAM_END = object()
+# Event types predict() keeps as final output items
+_PREDICT_KEEP = frozenset({"response.output_item.done", "error"})
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = _new_event_loop()
+            threading.Thread(
+                target=_sync_loop.run_forever, name="agent-sync-loop", daemon=True
+            ).start()
+    return _sync_loop
+
 
 class WrappedAgent(ResponsesAgent):
     """ResponsesAgent wrapper with Lakebase-backed store + checkpointer.
@@ -391,13 +508,70 @@ class WrappedAgent(ResponsesAgent):
         cfg: dict[str, Any] = None,
     ):
         self.workflow = workflow
-        self.workspace_client = workspace_client or WorkspaceClient()
+        self.workspace_client = workspace_client or _default_workspace_client()
         self.config = cfg
 
         self.lakebase_autoscaling_project = cfg["lakebase"]["project_id"]
         self.lakebase_autoscaling_branch = cfg["lakebase"]["branch_id"]
         self.embedding_endpoint = cfg["lakebase"]["embedding"]
         self.embedding_dim = cfg["lakebase"]["embedding_dim"]
+        self.pool_min_size = cfg["lakebase"].get("pool_min_size", 2)
+        self.pool_max_size = cfg["lakebase"].get("pool_max_size", 20)
+        # Compiled graph per (store, checkpointer); the workflow is fixed for
+        # this instance (rebuilds create a new WrappedAgent), so compile once.
+        self._compiled: dict[tuple, Any] = {}
+
+    async def _open_lakebase(self) -> tuple[AsyncExitStack, AsyncDatabricksStore, AsyncCheckpointSaver]:
+        lakebase_kwargs = dict(
+            project=self.lakebase_autoscaling_project,
+            branch=self.lakebase_autoscaling_branch,
+            workspace_client=self.workspace_client,
+            # Warm connections so concurrent turns don't queue behind a fresh connect
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+        )
+        stack = AsyncExitStack()
+        try:
+            store = await stack.enter_async_context(
+                AsyncDatabricksStore(
+                    **lakebase_kwargs,
+                    embedding_endpoint=self.embedding_endpoint,
+                    embedding_dims=self.embedding_dim,
+                )
+            )
+            checkpointer = await stack.enter_async_context(AsyncCheckpointSaver(**lakebase_kwargs))
+            await store.setup()
+            await checkpointer.setup()
+        except BaseException:
+            await stack.aclose()
+            raise
+        logger.info("Opened Lakebase store + checkpointer pools")
+        return stack, store, checkpointer
+
+    async def _lakebase(self) -> tuple[AsyncDatabricksStore, AsyncCheckpointSaver]:
+        """Return the shared store and checkpointer, opening their pools once.
+
+        The Postgres pools are bound to the event loop that opened them, so
+        they are cached per loop and per Lakebase target in ``_LAKEBASE_POOLS``
+        and reused by every request (and every rebuilt WrappedAgent) on that
+        loop. A failed open is retried on the next request.
+        """
+        loop = asyncio.get_running_loop()
+        key = (
+            self.lakebase_autoscaling_project,
+            self.lakebase_autoscaling_branch,
+            self.embedding_endpoint,
+            self.embedding_dim,
+            self.pool_min_size,
+            self.pool_max_size,
+        )
+        tasks = _LAKEBASE_POOLS.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = loop.create_task(self._open_lakebase())
+            tasks[key] = task
+        _, store, checkpointer = await asyncio.shield(task)
+        return store, checkpointer
 
     def _compile(self, store: Optional[BaseStore] = None, checkpointer=None):
         if self.workflow is None:
@@ -412,121 +586,124 @@ class WrappedAgent(ResponsesAgent):
         return self.workflow.compile(**kwargs)
 
     def predict(self, request: ResponsesAgentRequest) -> ResponsesAgentResponse:
-        seen_ids: set[str] = set()
-        outputs = []
-        for event in self.predict_stream(request):
-            if event.type == "response.output_item.done" or event.type == "error":
-                item_id = getattr(event.item, "id", None)
-                if item_id and item_id in seen_ids:
-                    continue
-                if item_id:
-                    seen_ids.add(item_id)
-                outputs.append(event.item)
+        # Collect on the background loop in one go; only the final items are kept, so
+        # the events don't need to cross over to this thread one by one
+        async def _collect() -> list:
+            seen_ids: set[str] = set()
+            outputs = []
+            async for event in self._predict_stream_async(request):
+                if event.type in _PREDICT_KEEP:
+                    item_id = getattr(event.item, "id", None)
+                    if item_id and item_id in seen_ids:
+                        continue
+                    if item_id:
+                        seen_ids.add(item_id)
+                    outputs.append(event.item)
+            return outputs
+
+        outputs = asyncio.run_coroutine_threadsafe(_collect(), _get_sync_loop()).result()
         return ResponsesAgentResponse(output=outputs, custom_outputs=request.custom_inputs)
 
     async def _predict_stream_async(
         self,
         request: ResponsesAgentRequest,
     ) -> AsyncGenerator[ResponsesAgentStreamEvent, None]:
-        lakebase_kwargs = dict(
-            project=self.lakebase_autoscaling_project,
-            branch=self.lakebase_autoscaling_branch,
-            workspace_client=self.workspace_client
-        )
-        async with (
-            AsyncDatabricksStore(
-                **lakebase_kwargs,
-                embedding_endpoint=self.embedding_endpoint,
-                embedding_dims=self.embedding_dim,
-            ) as store,
-            AsyncCheckpointSaver(**lakebase_kwargs) as checkpointer,
-        ):
-            await store.setup()
-            await checkpointer.setup()
-            self.agent = self._compile(store=store, checkpointer=checkpointer)
-
-            cc_msgs = to_chat_completions_input([i.model_dump() for i in request.input])
-            ci = dict(request.custom_inputs or {})
-            recursion_limit = ci.get("recursion_limit", 25)
-            thread_id = ci.get("thread_id", str(uuid4()))
-            user_id = get_user_id(request)
-
-            if user_id:
-                last_user_msg = ""
-                for m in reversed(cc_msgs):
-                    if getattr(m, "type", None) == "human" or (isinstance(m, dict) and m.get("role") == "user"):
-                        last_user_msg = m.content if hasattr(m, "content") else m.get("content", "")
-                        break
-                memory_ctx = await fetch_user_memories(store, user_id, query=last_user_msg)
-                if memory_ctx:
-                    cc_msgs = inject_memory_into_messages(cc_msgs, memory_ctx)
-
-            enabled_mcps = ci.get("enabled_mcps")
-            if enabled_mcps is not None:
-                all_servers = set(_tool_server_map.values())
-                disabled_mcps = frozenset(all_servers - set(enabled_mcps))
-            else:
-                disabled_mcps = frozenset()
-            _ctx_token = _disabled_mcps_ctx.set(disabled_mcps)
-            if disabled_mcps:
-                logger.info("Disabled MCP servers for this request: %s", disabled_mcps)
-
-            _log_request_inventory(self.config, cc_msgs, enabled_mcps)
-
-            inputs = {"messages": cc_msgs}
-            config: dict[str, Any] = {
-                "configurable": {
-                    "thread_id": thread_id,
-                    "store": store,
-                },
-                "recursion_limit": recursion_limit,
-            }
-            if user_id:
-                config["configurable"]["user_id"] = user_id
-
-            existing_state = await self.agent.aget_state(config)
-            seen_msg_ids: set[str] = {
-                getattr(msg, "id", None)
-                for msg in (existing_state.values or {}).get("messages", [])
-                if getattr(msg, "id", None)
-            }
+        store, checkpointer = await self._lakebase()
+        # Local, not self.agent: requests on the server loop and on _sync_loop run
+        # concurrently, and each must keep the graph bound to its own loop's pools
+        agent = self._compiled.get((store, checkpointer))
+        if agent is None:
+            agent = self._compiled.setdefault(
+                (store, checkpointer), self._compile(store=store, checkpointer=checkpointer)
+            )
 
-            try:
-                async for event in process_agent_astream_events(
-                    self.agent.astream(
-                        inputs,
-                        config=config,
-                        stream_mode=["updates", "messages"],
-                        subgraphs=True,
-                    ),
-                    seen_msg_ids=seen_msg_ids,
-                ):
-                    yield event
-            except Exception as e:
-                logger.exception("Error during agent streaming")
-                error_msg = AIMessage(content=f"**Agent error:** `{type(e).__name__}`: {e}")
-                for item in output_to_responses_items_stream([error_msg]):
-                    yield item
-            finally:
-                _disabled_mcps_ctx.reset(_ctx_token)
+        # None fields are dropped rather than copied; defaults stay, they carry the item type
+        cc_msgs = to_chat_completions_input([i.model_dump(exclude_none=True) for i in request.input])
+        ci = request.custom_inputs or {}
+        recursion_limit = ci.get("recursion_limit", 25)
+        thread_id = ci.get("thread_id", str(uuid4()))
+        user_id = get_user_id(request)
+
+        if user_id:
+            last_user_msg = ""
+            for m in reversed(cc_msgs):
+                if getattr(m, "type", None) == "human" or (isinstance(m, dict) and m.get("role") == "user"):
+                    last_user_msg = m.content if hasattr(m, "content") else m.get("content", "")
+                    break
+            memory_ctx = await fetch_user_memories(store, user_id, query=last_user_msg)
+            if memory_ctx:
+                cc_msgs = inject_memory_into_messages(cc_msgs, memory_ctx)
+
+        enabled_mcps = ci.get("enabled_mcps")
+        if enabled_mcps is not None:
+            all_servers = set(_tool_server_map.values())
+            disabled_mcps = frozenset(all_servers - set(enabled_mcps))
+        else:
+            disabled_mcps = frozenset()
+        _ctx_token = _disabled_mcps_ctx.set(disabled_mcps)
+        if disabled_mcps:
+            logger.info("Disabled MCP servers for this request: %s", disabled_mcps)
+
+        _log_request_inventory(self.config, cc_msgs, enabled_mcps)
+
+        inputs = {"messages": cc_msgs}
+        config: dict[str, Any] = {
+            "configurable": {
+                "thread_id": thread_id,
+                "store": store,
+            },
+            "recursion_limit": recursion_limit,
+        }
+        if user_id:
+            config["configurable"]["user_id"] = user_id
+
+        existing_state = await agent.aget_state(config)
+        seen_msg_ids: set[str] = {
+            getattr(msg, "id", None)
+            for msg in (existing_state.values or {}).get("messages", [])
+            if getattr(msg, "id", None)
+        }
+
+        try:
+            async for event in process_agent_astream_events(
+                agent.astream(
+                    inputs,
+                    config=config,
+                    stream_mode=["updates", "messages"],
+                    subgraphs=True,
+                    durability=_CHECKPOINT_DURABILITY,
+                ),
+                seen_msg_ids=seen_msg_ids,
+            ):
+                yield event
+        except Exception as e:
+            logger.exception("Error during agent streaming")
+            error_msg = AIMessage(content=f"**Agent error:** `{type(e).__name__}`: {e}")
+            for item in output_to_responses_items_stream([error_msg]):
+                yield item
+        finally:
+            _disabled_mcps_ctx.reset(_ctx_token)
 
     def predict_stream(
         self, request: ResponsesAgentRequest
     ) -> Generator[ResponsesAgentStreamEvent, None, None]:
-        agen = self._predict_stream_async(request)
-
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        ait = agen.__aiter__()
+        # One task drains the whole stream on the background loop and hands items over
+        # through a queue, instead of a cross-thread round-trip per item. Running in a
+        # single task also keeps the stream's contextvars set and reset in one context.
+        q: queue.Queue = queue.Queue()
 
-        while True:
+        async def _drain():
             try:
-                item = loop.run_until_complete(ait.__anext__())
-            except StopAsyncIteration:
-                break
-            else:
-                yield item
\ No newline at end of file
+                async for item in self._predict_stream_async(request):
+                    q.put(item)
+            finally:
+                q.put(_STREAM_END)
+
+        fut = asyncio.run_coroutine_threadsafe(_drain(), _get_sync_loop())
+        try:
+            while (item := q.get()) is not _STREAM_END:
+                yield item
+            fut.result()
+        finally:
+            # consumer stopped early (or finished): stop the drain task
+            fut.cancel()
\ No newline at end of file
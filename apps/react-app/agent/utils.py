@@ -3,7 +3,7 @@ import os
 import time
 import contextvars
 from databricks.sdk import WorkspaceClient
-from base64 import b64decode
+from binascii import a2b_base64
 import mlflow
 import yaml
 import threading
@@ -11,6 +11,10 @@ from mlflow.types.responses import ResponsesAgentRequest
 from uuid import uuid4
 import asyncio
 import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -85,10 +89,26 @@ def init_mlflow():
     mlflow.set_experiment(experiment_id=str(experiment_id).strip())
 
 
+@lru_cache(maxsize=1)
+def _default_workspace_client() -> WorkspaceClient:
+    """Default-auth WorkspaceClient, built on first use rather than at import."""
+    return WorkspaceClient()
+
+
+# Decoded secrets per (scope, key); re-read after the TTL so rotated secrets are picked up
+_secret_cache: dict[tuple[str, str], tuple[float, str]] = {}
+_SECRET_CACHE_SECS = int(os.environ.get("SECRET_CACHE_SECS", 3600))
+
+
 def get_secret(scope: str, key: str) -> str:
-    w0 = WorkspaceClient()
+    entry = _secret_cache.get((scope, key))
+    if entry is not None and time.monotonic() - entry[0] < _SECRET_CACHE_SECS:
+        return entry[1]
+    w0 = _default_workspace_client()
     secret_base64 = w0.secrets.get_secret(scope, key).value
-    return b64decode(secret_base64).decode("utf-8")
+    value = a2b_base64(secret_base64).decode("utf-8")
+    _secret_cache[(scope, key)] = (time.monotonic(), value)
+    return value
 
 
 def get_secret_from_cfg(cfg) -> tuple[str | None, str | None]:
@@ -99,8 +119,11 @@ def get_secret_from_cfg(cfg) -> tuple[str | None, str | None]:
         return None, None
     scope_name = next(iter(sp_creds))
     scope_cfg = sp_creds[scope_name]
-    client_id = get_secret(scope=scope_name, key=scope_cfg["client_id"])
-    client_secret = get_secret(scope=scope_name, key=scope_cfg["client_secret"])
+    # independent secret-store round-trips; fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        client_id, client_secret = pool.map(
+            lambda k: get_secret(scope=scope_name, key=scope_cfg[k]), ("client_id", "client_secret")
+        )
     print(f"Service Principal credentials found for {scope_name}: {client_id}")
     return client_id, client_secret
 
@@ -195,6 +218,84 @@ def _mcp_run(coro, timeout=300):
     return asyncio.run_coroutine_threadsafe(coro, _mcp_loop).result(timeout=timeout)
 
 
+# Sent on every MCP session. httpx advertises zstd whenever zstandard is
+# installed; tiny JSON-RPC frames gain nothing from it, so pin gzip/identity.
+_MCP_DEFAULT_HEADERS = {"Accept-Encoding": "gzip, identity"}
+# Same defaults as mcp's create_mcp_http_client, which this factory replaces
+_MCP_DEFAULT_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+
+class _SharedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Connection pool owned by ``PooledMcpHttpClientFactory``.
+
+    MCP sessions close their httpx client on exit; these no-ops keep the
+    underlying keep-alive connections open for the next session.
+    """
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class PooledMcpHttpClientFactory:
+    """httpx client factory that shares one connection pool per event loop.
+
+    langchain-mcp-adapters opens a new MCP session (and httpx client) for
+    every tools/list and tools/call, so each call otherwise pays its own
+    TCP + TLS handshake. All servers here live on one or two hosts, so a
+    shared keep-alive pool turns those into reused connections. Databricks
+    OAuth providers are rebuilt per client exactly like
+    ``DatabricksMcpHttpClientFactory`` so tokens keep refreshing.
+    """
+
+    def __init__(self, max_connections: int = 32, max_keepalive_connections: int = 16):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SharedAsyncTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _transport(self) -> _SharedAsyncTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = _SharedAsyncTransport(limits=self._limits)
+            self._transports[loop] = transport
+        return transport
+
+    def __call__(
+        self,
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        from databricks_mcp import DatabricksOAuthClientProvider
+
+        if isinstance(auth, DatabricksOAuthClientProvider) and auth.workspace_client is not None:
+            auth = DatabricksOAuthClientProvider(auth.workspace_client)
+        return httpx.AsyncClient(
+            headers={**_MCP_DEFAULT_HEADERS, **(headers or {})},
+            timeout=timeout if timeout is not None else _MCP_DEFAULT_TIMEOUT,
+            auth=auth,
+            follow_redirects=True,
+            transport=self._transport(),
+        )
+
+
+_mcp_http_client_factory = PooledMcpHttpClientFactory()
+
+
+def use_pooled_mcp_http(mcp_client):
+    """Point every connection of *mcp_client* at the shared httpx pool."""
+    for connection in mcp_client.connections.values():
+        connection["httpx_client_factory"] = _mcp_http_client_factory
+    return mcp_client
+
+
 def _log_exception_group(exc: BaseException, server_names: str = "") -> None:
     """Recursively log all sub-exceptions from an ExceptionGroup."""
     prefix = f"[{server_names}] " if server_names else ""
@@ -213,7 +314,7 @@ def _log_exception_group(exc: BaseException, server_names: str = "") -> None:
         logger.error("  %sMCP root cause: %s: %s", prefix, type(exc).__name__, exc)
 
 
-def build_mcp_list(cfg, ws_client=WorkspaceClient()):
+def build_mcp_list(cfg, ws_client: WorkspaceClient | None = None):
     """Build a list of MCP server objects from config.yml sections.
 
     Reads three config sections:
@@ -227,17 +328,26 @@ def build_mcp_list(cfg, ws_client=WorkspaceClient()):
     """
     from databricks_langchain import DatabricksMCPServer, MCPServer
 
+    ws_client = ws_client or _default_workspace_client()
     servers = []
     host = cfg.get("host", "").rstrip("/") + "/"
 
     # --- External (non-Databricks) MCP servers ---
-    for name, mcp_cfg in cfg.get("external_mcp", {}).items():
+    # Each bearer token is its own Secrets API round-trip, so fetch them together
+    external_mcp = cfg.get("external_mcp", {})
+    secret_names = [name for name, mcp_cfg in external_mcp.items() if "secret" in mcp_cfg]
+    tokens = {}
+    if secret_names:
+        with ThreadPoolExecutor(max_workers=len(secret_names)) as pool:
+            tokens = dict(zip(secret_names, pool.map(
+                lambda n: get_secret(scope=external_mcp[n].get("scope"), key=external_mcp[n].get("secret")),
+                secret_names,
+            )))
+    for name, mcp_cfg in external_mcp.items():
         url = mcp_cfg["url"]
         kwargs = dict(name=name, url=url, timeout=60, terminate_on_close=False)
         if "secret" in mcp_cfg:
-            kwargs["headers"] = {
-                "Authorization": f"Bearer {get_secret(scope=mcp_cfg.get('scope'), key=mcp_cfg.get('secret'))}"
-            }
+            kwargs["headers"] = {"Authorization": f"Bearer {tokens[name]}"}
             print(f"Getting bearer token from scope {mcp_cfg.get('scope')} and secret {mcp_cfg.get('secret')}")
         servers.append(MCPServer(**kwargs))
 
@@ -279,36 +389,88 @@ def build_mcp_list(cfg, ws_client=WorkspaceClient()):
     return servers
 
 
+# Tools listed per MCP server, keyed by (server name, url) -> (listed_at, tools).
+# Agent rebuilds triggered from the UI (LLM switch, data-source toggles) reuse
+# these instead of repeating the initialize + tools/list handshake for every
+# server. Entries older than MCP_TOOLS_CACHE_SECS are listed again so tools a
+# server adds or removes show up without restarting the app.
+_mcp_tools_cache: dict[tuple[str, str], tuple[float, list]] = {}
+_mcp_tools_cache_lock = threading.Lock()
+_MCP_TOOLS_CACHE_SECS = int(os.environ.get("MCP_TOOLS_CACHE_SECS", 3600))
+
+
+def _mcp_tools_cached(srv) -> bool:
+    entry = _mcp_tools_cache.get((srv.name, srv.url))
+    return entry is not None and time.monotonic() - entry[0] < _MCP_TOOLS_CACHE_SECS
+
+
+def load_mcp_tools(mcp_client, servers, server_map: dict | None = None) -> list:
+    """Return tools for *servers*, listing only those not already cached.
+
+    Uncached servers are listed concurrently on ``_mcp_loop`` via
+    ``mcp_client.get_tools(server_name=...)``; any failure propagates so the
+    caller can fall back to ``_load_mcp_tools_individually``. Cached tools are
+    handed out as shallow copies because ``wrap_mcp_tools_with_resilience``
+    patches ``tool.coroutine`` in place.
+    """
+    with _mcp_tools_cache_lock:
+        missing = [s for s in servers if not _mcp_tools_cached(s)]
+
+    if missing:
+        async def _list_missing():
+            return await asyncio.gather(
+                *(mcp_client.get_tools(server_name=s.name) for s in missing)
+            )
+
+        listed = _mcp_run(_list_missing())
+        with _mcp_tools_cache_lock:
+            for srv, tools in zip(missing, listed):
+                _mcp_tools_cache[(srv.name, srv.url)] = (time.monotonic(), tools)
+                logger.info("  ✓ %s: %d tools listed", srv.name, len(tools))
+
+    all_tools = []
+    with _mcp_tools_cache_lock:
+        for srv in servers:
+            _, tools = _mcp_tools_cache[(srv.name, srv.url)]
+            all_tools.extend(t.model_copy() for t in tools)
+            if server_map is not None:
+                for t in tools:
+                    server_map[t.name] = srv.name
+    logger.info(
+        "MCP tools ready: %d total across %d servers (%d listed, %d cached)",
+        len(all_tools), len(servers), len(missing), len(servers) - len(missing),
+    )
+    return all_tools
+
+
 def _load_mcp_tools_individually(
     servers, max_retries: int = 3, server_map: dict | None = None
 ) -> list:
     """Try loading tools from each MCP server with retries; skip persistent failures.
 
+    Servers are loaded concurrently on ``_mcp_loop`` (each with its own
+    client and backoff), so bring-up costs roughly the slowest server rather
+    than the sum of all handshakes. Servers that load are added to the
+    per-server tool cache used by ``load_mcp_tools``.
+
     If *server_map* is provided it is updated in-place with
     ``{tool_name: server_name}`` entries so callers can look up which
     server owns a given tool at request time.
     """
     from databricks_langchain import DatabricksMultiServerMCPClient
 
-    all_tools = []
-    for srv in servers:
-        loaded = False
+    async def _load_one(srv) -> list:
         for attempt in range(1, max_retries + 1):
-            single_client = DatabricksMultiServerMCPClient([srv])
+            single_client = use_pooled_mcp_http(DatabricksMultiServerMCPClient([srv]))
             try:
-                tools = _mcp_run(single_client.get_tools(), timeout=300)
+                tools = await single_client.get_tools()
                 logger.info(
                     "  ✓ %s: %d tools loaded (attempt %d)",
                     srv.name,
                     len(tools),
                     attempt,
                 )
-                all_tools.extend(tools)
-                if server_map is not None:
-                    for t in tools:
-                        server_map[t.name] = srv.name
-                loaded = True
-                break
+                return tools
             except BaseException as e:
                 _log_exception_group(e, server_names=srv.name)
                 if attempt < max_retries:
@@ -320,11 +482,26 @@ def _load_mcp_tools_individually(
                         max_retries,
                         wait,
                     )
-                    time.sleep(wait)
+                    await asyncio.sleep(wait)
                 else:
                     logger.warning(
                         "  ✗ %s: failed after %d attempts", srv.name, max_retries
                     )
+        return []
+
+    async def _load_all():
+        return await asyncio.gather(*(_load_one(srv) for srv in servers))
+
+    all_tools = []
+    for srv, tools in zip(servers, _mcp_run(_load_all(), timeout=300)):
+        if not tools:
+            continue
+        with _mcp_tools_cache_lock:
+            _mcp_tools_cache[(srv.name, srv.url)] = (time.monotonic(), tools)
+        all_tools.extend(t.model_copy() for t in tools)
+        if server_map is not None:
+            for t in tools:
+                server_map[t.name] = srv.name
     logger.info("MCP tools loaded: %d total across %d servers", len(all_tools), len(servers))
     return all_tools
 
@@ -391,9 +568,35 @@ def _keepalive_loop(get_state, keepalive_secs=600) -> None:
                 _touch_activity()
 
 
+@lru_cache(maxsize=None)
+def get_uc_function_tools(function_names: tuple[str, ...]) -> tuple:
+    """Resolve UC function tools once per function list.
+
+    ``UCFunctionToolkit`` fetches each function's signature from Unity
+    Catalog, so both agent rebuilds and ``_collect_tool_metadata`` reuse
+    the resolved tools. Call ``get_uc_function_tools.cache_clear()`` after
+    redefining a function.
+    """
+    from databricks_langchain.uc_ai import UCFunctionToolkit
+
+    return tuple(UCFunctionToolkit(function_names=list(function_names)).tools)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(endpoint: str):
+    """One ``DatabricksEmbeddings`` client per serving endpoint.
+
+    Vector-search retrievers need an embedding object to pass validation even
+    when they only query by vector, so agent rebuilds share this one instead
+    of constructing a new client each time.
+    """
+    from databricks_langchain import DatabricksEmbeddings
+
+    return DatabricksEmbeddings(endpoint=endpoint)
+
+
 def _collect_tool_metadata(mcp_tools: list, cfg: dict) -> dict[str, list[dict]]:
     """Build a {agent_name: [{name, description}, ...]} dict from live tools and config."""
-    from databricks_langchain.uc_ai import UCFunctionToolkit
     from agent.utils_memory import memory_write_tools
 
     def _meta(t):
@@ -407,7 +610,7 @@ def _collect_tool_metadata(mcp_tools: list, cfg: dict) -> dict[str, list[dict]]:
     result["memory"] = [_meta(t) for t in memory_write_tools()]
     for agent_name, functions in cfg.get("uc_functions", {}).items():
         result[agent_name] = [
-            _meta(t) for t in UCFunctionToolkit(function_names=functions).tools
+            _meta(t) for t in get_uc_function_tools(tuple(functions))
         ]
     for agent_name, gc in cfg.get("genie", {}).items():
         result[agent_name] = [
@@ -496,7 +699,10 @@ def wrap_mcp_tools_with_resilience(tools, max_concurrent=2, call_delay=1.0):
     """Wrap MCP tools with concurrency limiting and graceful error handling.
 
     Prevents 429 rate-limit errors from external MCP servers by throttling
-    concurrent calls via a semaphore and inserting a delay after each call.
+    concurrent calls via a per-server semaphore and inserting a delay after
+    each call. Limits are per server (via ``_tool_server_map``) so parallel
+    supervisor tool calls fanned out to different servers don't queue
+    behind each other.
     Errors are returned as strings so the LLM can adapt rather than crashing
     the entire agent stream.
 
@@ -504,15 +710,18 @@ def wrap_mcp_tools_with_resilience(tools, max_concurrent=2, call_delay=1.0):
     using the per-request ``_disabled_mcps_ctx`` ContextVar and the startup-time
     ``_tool_server_map`` to identify which server each tool belongs to.
     """
-    sem = asyncio.Semaphore(max_concurrent)
+    sems: dict[str | None, asyncio.Semaphore] = {}
 
     for tool in tools:
         orig = tool.coroutine
         name = tool.name
         expects_tuple = getattr(tool, "response_format", None) == "content_and_artifact"
+        server = _tool_server_map.get(name)
+        if server not in sems:
+            sems[server] = asyncio.Semaphore(max_concurrent)
 
         async def _wrapped(
-            *args, _orig=orig, _name=name, _tuple=expects_tuple, **kwargs
+            *args, _orig=orig, _name=name, _tuple=expects_tuple, _sem=sems[server], **kwargs
         ):
             # Hard-block if the owning server is disabled for this request.
             disabled = _disabled_mcps_ctx.get()
@@ -526,7 +735,7 @@ def wrap_mcp_tools_with_resilience(tools, max_concurrent=2, call_delay=1.0):
                     logger.info("Blocked disabled MCP tool '%s' (server='%s')", _name, srv)
                     return (msg, None) if _tuple else msg
 
-            async with sem:
+            async with _sem:
                 try:
                     result = await _orig(*args, **kwargs)
                     await asyncio.sleep(call_delay)
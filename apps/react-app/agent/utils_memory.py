@@ -20,14 +20,16 @@ from langchain_core.tools import tool
 from langgraph.store.base import BaseStore
 from mlflow.types.responses import ResponsesAgentRequest
 
+from agent.utils import _default_workspace_client
+
 logger = logging.getLogger(__name__)
 
 
 def get_user_id(request: ResponsesAgentRequest) -> Optional[str]:
     """Extract user_id from request custom_inputs or context."""
-    custom_inputs = dict(request.custom_inputs or {})
-    if "user_id" in custom_inputs:
-        return custom_inputs["user_id"]
+    user_id = (request.custom_inputs or {}).get("user_id")
+    if user_id:
+        return user_id
     if request.context and getattr(request.context, "user_id", None):
         return request.context.user_id
     return None
@@ -44,7 +46,7 @@ def resolve_lakebase_instance_name(
     if not _is_lakebase_hostname(instance_name):
         return instance_name
 
-    client = workspace_client or WorkspaceClient()
+    client = workspace_client or _default_workspace_client()
     hostname = instance_name
 
     try:
@@ -151,49 +153,54 @@ def inject_memory_into_messages(messages: list, memory_ctx: str) -> list:
     return msgs
 
 
+@tool
+async def save_user_memory(
+    memory_key: str, memory_data_json: str, config: RunnableConfig
+) -> str:
+    """Save information about the user to long-term memory.
+
+    memory_key: a short descriptive identifier (e.g. 'preferred_targets')
+    memory_data_json: a JSON object string with the data to store
+    """
+    user_id = config.get("configurable", {}).get("user_id")
+    if not user_id:
+        return "Cannot save memory - no user_id provided."
+
+    store: Optional[BaseStore] = config.get("configurable", {}).get("store")
+    if not store:
+        return "Cannot save memory - store not configured."
+
+    namespace = ("user_memories", user_id.replace(".", "-"))
+    try:
+        memory_data = json.loads(memory_data_json)
+        if not isinstance(memory_data, dict):
+            return f"Failed: memory_data must be a JSON object, not {type(memory_data).__name__}"
+        await store.aput(namespace, memory_key, memory_data)
+        return f"Successfully saved memory '{memory_key}' for user."
+    except json.JSONDecodeError as e:
+        return f"Failed to save memory: Invalid JSON - {e}"
+
+
+@tool
+async def delete_user_memory(memory_key: str, config: RunnableConfig) -> str:
+    """Delete a specific memory from the user's long-term memory."""
+    user_id = config.get("configurable", {}).get("user_id")
+    if not user_id:
+        return "Cannot delete memory - no user_id provided."
+
+    store: Optional[BaseStore] = config.get("configurable", {}).get("store")
+    if not store:
+        return "Cannot delete memory - store not configured."
+
+    namespace = ("user_memories", user_id.replace(".", "-"))
+    await store.adelete(namespace, memory_key)
+    return f"Successfully deleted memory '{memory_key}' for user."
+
+
 def memory_write_tools():
-    """Save/delete tools for the memory agent (no retrieval — that's automatic)."""
-
-    @tool
-    async def save_user_memory(
-        memory_key: str, memory_data_json: str, config: RunnableConfig
-    ) -> str:
-        """Save information about the user to long-term memory.
-
-        memory_key: a short descriptive identifier (e.g. 'preferred_targets')
-        memory_data_json: a JSON object string with the data to store
-        """
-        user_id = config.get("configurable", {}).get("user_id")
-        if not user_id:
-            return "Cannot save memory - no user_id provided."
-
-        store: Optional[BaseStore] = config.get("configurable", {}).get("store")
-        if not store:
-            return "Cannot save memory - store not configured."
-
-        namespace = ("user_memories", user_id.replace(".", "-"))
-        try:
-            memory_data = json.loads(memory_data_json)
-            if not isinstance(memory_data, dict):
-                return f"Failed: memory_data must be a JSON object, not {type(memory_data).__name__}"
-            await store.aput(namespace, memory_key, memory_data)
-            return f"Successfully saved memory '{memory_key}' for user."
-        except json.JSONDecodeError as e:
-            return f"Failed to save memory: Invalid JSON - {e}"
-
-    @tool
-    async def delete_user_memory(memory_key: str, config: RunnableConfig) -> str:
-        """Delete a specific memory from the user's long-term memory."""
-        user_id = config.get("configurable", {}).get("user_id")
-        if not user_id:
-            return "Cannot delete memory - no user_id provided."
-
-        store: Optional[BaseStore] = config.get("configurable", {}).get("store")
-        if not store:
-            return "Cannot delete memory - store not configured."
-
-        namespace = ("user_memories", user_id.replace(".", "-"))
-        await store.adelete(namespace, memory_key)
-        return f"Successfully deleted memory '{memory_key}' for user."
+    """Save/delete tools for the memory agent (no retrieval — that's automatic).
 
+    The tools are built once at import; their schemas are introspected a
+    single time instead of on every agent rebuild.
+    """
     return [save_user_memory, delete_user_memory]
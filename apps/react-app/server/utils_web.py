@@ -10,14 +10,38 @@ import re
 import json
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
-from agent.utils import get_secret, load_config
+from agent.utils import _default_workspace_client, get_secret, load_config
+
+try:
+    # Linear-time DFA engine; immune to backtracking blow-ups on long responses
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+try:
+    from xxhash import xxh3_64_hexdigest as fast_hash
+except ImportError:
+    from hashlib import md5
+
+    def fast_hash(data: bytes) -> str:
+        """Non-cryptographic digest used for ETags (md5 fallback when xxhash is absent)."""
+        return md5(data, usedforsecurity=False).hexdigest()
 
 _app_root = Path(__file__).resolve().parent.parent
 
+# Shared keep-alive session for agent-port calls and MCP health checks, so
+# repeated requests to the same host reuse TCP (and TLS) connections instead
+# of opening one per call. Pool sized for the parallel MCP health checks.
+http_session = requests.Session()
+http_session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+http_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
 # ---------------------------------------------------------------------------
 # Config helpers
 # ---------------------------------------------------------------------------
@@ -143,17 +167,21 @@ def serialize_trace(trace) -> dict:
 # ---------------------------------------------------------------------------
 
 
+# Inline (?s) rather than flags= so the patterns compile under both re and re2.
+_TOOL_CALL_TAGS_RE = _re_engine.compile(
+    r"(?s)<function_calls>.*?</function_calls>"
+    r"|<thinking>.*?</thinking>"
+    r"|<results>.*?</results>"
+)
+_UNCLOSED_RESULTS_RE = _re_engine.compile(r"(?s)<results>.*")
+_EXTRA_BLANK_LINES_RE = _re_engine.compile(r"\n\s*\n\s*\n+")
+
+
 def strip_tool_call_tags(text_content: str) -> str:
     """Strip <function_calls>, <thinking>, and <results> tags from text."""
-    text_content = re.sub(
-        r"<function_calls>.*?</function_calls>", "", text_content, flags=re.DOTALL
-    )
-    text_content = re.sub(
-        r"<thinking>.*?</thinking>", "", text_content, flags=re.DOTALL
-    )
-    text_content = re.sub(r"<results>.*?</results>", "", text_content, flags=re.DOTALL)
-    text_content = re.sub(r"<results>.*", "", text_content, flags=re.DOTALL)
-    text_content = re.sub(r"\n\s*\n\s*\n+", "\n\n", text_content)
+    text_content = _TOOL_CALL_TAGS_RE.sub("", text_content)
+    text_content = _UNCLOSED_RESULTS_RE.sub("", text_content)
+    text_content = _EXTRA_BLANK_LINES_RE.sub("\n\n", text_content)
     return text_content.strip()
 
 
@@ -170,22 +198,23 @@ def stream_new_content(item: Optional[dict], _sse):
                     yield _sse({"type": "text", "content": cleaned})
 
 
-def parse_genie_results(trace_dict: dict) -> list[dict]:
-    """Extract Genie query results from poll_query_results spans."""
-    results = []
-    for span in trace_dict.get("spans", []):
+def iter_genie_results(trace_dict: dict) -> Iterator[dict]:
+    """Yield Genie query results from poll_query_results spans."""
+    for span in trace_dict.get("spans", ()):
         if span.get("name") != "poll_query_results":
             continue
         outputs = span.get("outputs")
-        if isinstance(outputs, dict) and outputs.get("result"):
-            results.append(
-                {
-                    "result": outputs.get("result", ""),
-                    "query": outputs.get("query", ""),
-                    "description": outputs.get("description", ""),
-                }
-            )
-    return results
+        if isinstance(outputs, dict) and (result := outputs.get("result")):
+            yield {
+                "result": result,
+                "query": outputs.get("query", ""),
+                "description": outputs.get("description", ""),
+            }
+
+
+def parse_genie_results(trace_dict: dict) -> list[dict]:
+    """Extract Genie query results from poll_query_results spans."""
+    return list(iter_genie_results(trace_dict))
 
 
 def extract_text_content(response_json: dict) -> list[str]:
@@ -308,9 +337,20 @@ def _smart_title(s: str) -> str:
     return " ".join(w if w.isupper() else w.title() for w in s.split())
 
 
-def _parse_skill_frontmatter(content: str) -> dict:
+_FRONTMATTER_HEAD_BYTES = 4096
+_FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+
+
+def _match_frontmatter(content: str) -> Optional[re.Match]:
+    """Match the frontmatter block, scanning only the head of the file when possible."""
+    if not content.startswith("---"):
+        return None
+    return _FRONTMATTER_RE.match(content, 0, _FRONTMATTER_HEAD_BYTES) or _FRONTMATTER_RE.match(content)
+
+
+def _parse_skill_frontmatter(content: str, match: Optional[re.Match] = None) -> dict:
     """Parse YAML frontmatter (between --- delimiters) from a SKILL.md file."""
-    match = re.match(r"^---\s*\n(.*?)\n---\s*\n", content, re.DOTALL)
+    match = match or _match_frontmatter(content)
     if match:
         try:
             return yaml.safe_load(match.group(1)) or {}
@@ -319,22 +359,53 @@ def _parse_skill_frontmatter(content: str) -> dict:
     return {}
 
 
+def _read_skill_frontmatter(skill_file: Path) -> dict:
+    """Parse SKILL.md frontmatter from the head of the file without reading the body."""
+    with open(skill_file, "rb") as f:
+        head = f.read(_FRONTMATTER_HEAD_BYTES)
+    if not head.startswith(b"---"):
+        return {}
+    end = head.find(b"\n---", 3)
+    eol = head.find(b"\n", end + 4) if end >= 0 else -1
+    if eol < 0:
+        # Frontmatter longer than the head slice: fall back to a full read
+        return _parse_skill_frontmatter(skill_file.read_text(encoding="utf-8"))
+    return _parse_skill_frontmatter(head[: eol + 1].decode("utf-8"))
+
+
+# (skills_dir, SKILL.md mtimes) -> discovered skills; re-read only when a skill changes
+_skills_cache: dict[Path, tuple[tuple, dict]] = {}
+
+
 def discover_skills(skills_dir: Optional[Union[str, Path]] = None) -> dict:
-    """Scan the skills directory and return metadata keyed by skill folder name."""
+    """Scan the skills directory and return metadata keyed by skill folder name.
+
+    Results are cached per directory and reused until a SKILL.md is added, removed
+    or modified, so /api/skills only stats the files on a warm cache.
+    """
     skills_dir = Path(skills_dir) if skills_dir else SKILLS_DIR
-    skills: dict[str, dict] = {}
     if not skills_dir.exists():
-        return skills
+        return {}
 
-    for folder in skills_dir.iterdir():
-        if not folder.is_dir():
-            continue
-        skill_file = folder / "SKILL.md"
-        if not skill_file.exists():
+    with os.scandir(skills_dir) as entries:
+        folders = [Path(e.path) for e in entries if e.is_dir()]
+    signature = []
+    for folder in folders:
+        try:
+            signature.append((folder.name, (folder / "SKILL.md").stat().st_mtime_ns))
+        except OSError:
             continue
+    signature = tuple(sorted(signature))
+
+    cached = _skills_cache.get(skills_dir)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1])
+
+    skills: dict[str, dict] = {}
+    for folder_name, _ in signature:
+        folder = skills_dir / folder_name
         try:
-            content = skill_file.read_text(encoding="utf-8")
-            fm = _parse_skill_frontmatter(content)
+            fm = _read_skill_frontmatter(folder / "SKILL.md")
             name = fm.get("name", folder.name)
             description = fm.get("description", "")
             label = _smart_title(name.replace("-", " "))
@@ -351,33 +422,79 @@ def discover_skills(skills_dir: Optional[Union[str, Path]] = None) -> dict:
             }
         except Exception:
             continue
-    return skills
+    _skills_cache[skills_dir] = (signature, skills)
+    return dict(skills)
+
+
+_SKILL_WRAPPER = (
+    "You have been given a specialized skill to help with this task. "
+    "Follow the workflow instructions carefully.\n\n"
+    "<skill_instructions>\n{instr}\n</skill_instructions>\n\n"
+    "<user_request>\n{query}\n</user_request>\n\n"
+    "Execute the skill workflow to address the user's request. "
+    "Follow each step methodically and provide the expected output format."
+)
+
+# skill_path -> (mtime signature, loaded skill dict)
+_skill_content_cache: dict[Path, tuple[tuple, dict]] = {}
+
+
+def _skill_mtime_signature(skill_path: Path) -> tuple:
+    """Return the mtimes of SKILL.md and its reference files (cache invalidation key)."""
+    sig = [(skill_path / "SKILL.md").stat().st_mtime_ns]
+    refs_dir = skill_path / "references"
+    if refs_dir.exists():
+        with os.scandir(refs_dir) as entries:
+            sig.extend(sorted((e.name, e.stat().st_mtime_ns) for e in entries))
+    return tuple(sig)
 
 
 def load_skill_content(
     skill_name: str, skills_dir: Optional[Union[str, Path]] = None
 ) -> Optional[dict]:
-    """Load full SKILL.md + reference files for a given skill."""
+    """Load full SKILL.md + reference files for a given skill.
+
+    Results are cached per skill folder and reused until any of the files change.
+    """
     skills_dir = Path(skills_dir) if skills_dir else SKILLS_DIR
     skill_path = skills_dir / skill_name
     skill_file = skill_path / "SKILL.md"
     if not skill_file.exists():
         return None
+    try:
+        sig = _skill_mtime_signature(skill_path)
+    except OSError:
+        return None
+    cached = _skill_content_cache.get(skill_path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+
+    skill_data = _read_skill_content(skill_name, skill_path)
+    if skill_data is not None:
+        _skill_content_cache[skill_path] = (sig, skill_data)
+    return skill_data
+
+
+def _read_skill_content(skill_name: str, skill_path: Path) -> Optional[dict]:
+    """Read and assemble SKILL.md + reference files from disk (uncached)."""
+    skill_file = skill_path / "SKILL.md"
     try:
         full_content = skill_file.read_text(encoding="utf-8")
-        fm = _parse_skill_frontmatter(full_content)
-        match = re.match(r"^---\s*\n.*?\n---\s*\n(.*)$", full_content, re.DOTALL)
-        body = match.group(1).strip() if match else full_content
+        match = _match_frontmatter(full_content)
+        fm = _parse_skill_frontmatter(full_content, match)
+        body = full_content[match.end():].strip() if match else full_content
 
         references: dict[str, str] = {}
         refs_dir = skill_path / "references"
         if refs_dir.exists():
-            for ref_file in refs_dir.iterdir():
-                if ref_file.is_file() and ref_file.suffix == ".md":
-                    try:
-                        references[ref_file.name] = ref_file.read_text(encoding="utf-8")
-                    except Exception:
-                        continue
+            # DirEntry caches the d_type from readdir, so is_file() needs no extra stat
+            with os.scandir(refs_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and entry.name.endswith(".md"):
+                        try:
+                            references[entry.name] = Path(entry.path).read_text(encoding="utf-8")
+                        except Exception:
+                            continue
 
         full_prompt = f"# Skill: {fm.get('name', skill_name)}\n\n{body}"
         if references:
@@ -402,20 +519,21 @@ def build_prompt_with_skill(
     skill_data = load_skill_content(skill_name, skills_dir)
     if not skill_data:
         return user_query
-    return (
-        "You have been given a specialized skill to help with this task. "
-        "Follow the workflow instructions carefully.\n\n"
-        f"<skill_instructions>\n{skill_data['full_prompt']}\n</skill_instructions>\n\n"
-        f"<user_request>\n{user_query}\n</user_request>\n\n"
-        "Execute the skill workflow to address the user's request. "
-        "Follow each step methodically and provide the expected output format."
-    )
+    return _SKILL_WRAPPER.format(instr=skill_data["full_prompt"], query=user_query)
+
+
+_USER_REQUEST_OPEN = "<user_request>"
+_USER_REQUEST_CLOSE = "</user_request>"
 
 
 def extract_user_request(prompt: str) -> str:
     """Extract the user query from <user_request> tags, or return the original prompt."""
-    match = re.search(r"<user_request>\s*(.*?)\s*</user_request>", prompt, re.DOTALL)
-    return match.group(1).strip() if match else prompt
+    start = prompt.find(_USER_REQUEST_OPEN)
+    if start < 0:
+        return prompt
+    start += len(_USER_REQUEST_OPEN)
+    end = prompt.find(_USER_REQUEST_CLOSE, start)
+    return prompt[start:end].strip() if end >= 0 else prompt
 
 
 # ---------------------------------------------------------------------------
@@ -455,25 +573,35 @@ def get_mcp_servers() -> dict[str, dict]:
     return _MCP_SERVERS
 
 
-def _databricks_auth_headers(cfg: dict, server_type: str, name: str) -> dict[str, str]:
-    """Build Authorization headers for Databricks-authenticated MCP servers."""
+@lru_cache(maxsize=32)
+def _m2m_workspace_client(host: str, client_id: str, client_secret: str):
+    """One OAuth M2M client per SP, so health checks reuse its token until it expires."""
     from databricks.sdk import WorkspaceClient
 
+    return WorkspaceClient(
+        host=host,
+        client_id=client_id,
+        client_secret=client_secret,
+        auth_type="oauth-m2m",
+    )
+
+
+def _databricks_auth_headers(cfg: dict, server_type: str, name: str) -> dict[str, str]:
+    """Build Authorization headers for Databricks-authenticated MCP servers."""
     if server_type == "custom":
         mcp_cfg = cfg.get("custom_mcp", {}).get(name, {})
         if "scope" in mcp_cfg:
-            client_id = get_secret(scope=mcp_cfg["scope"], key=mcp_cfg["client_id"])
-            client_secret = get_secret(scope=mcp_cfg["scope"], key=mcp_cfg["secret"])
-            ws = WorkspaceClient(
-                host=mcp_cfg.get("host") or cfg.get("host"),
-                client_id=client_id,
-                client_secret=client_secret,
-                auth_type="oauth-m2m",
-            )
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                client_id, client_secret = pool.map(
+                    lambda k: get_secret(scope=mcp_cfg["scope"], key=mcp_cfg[k]), ("client_id", "secret")
+                )
+            ws = _m2m_workspace_client(mcp_cfg.get("host") or cfg.get("host"), client_id, client_secret)
         else:
-            ws = WorkspaceClient()
+            ws = _default_workspace_client()
     else:
-        ws = WorkspaceClient()
+        ws = _default_workspace_client()
 
     # headers: dict[str, str] = {}
     # ws.config.authenticate(headers)
@@ -519,7 +647,7 @@ def check_mcp_server(name: str, server_info: dict, timeout: float = 5.0) -> dict
             return {"name": name, "url": url, "ok": False, "status": "error", "error": f"auth_failed: {e}"}
 
     try:
-        resp = requests.post(url, json=mcp_init, headers=headers, timeout=timeout)
+        resp = http_session.post(url, json=mcp_init, headers=headers, timeout=timeout)
         if resp.status_code < 400:
             return {"name": name, "url": url, "ok": True, "status": "connected", "status_code": resp.status_code}
         # Databricks App MCP servers return 403 for simple POSTs because they
@@ -13,10 +13,9 @@ import os
 import json
 import logging
 import httpx
-import requests
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse
+from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from databricks.sdk import WorkspaceClient
@@ -38,6 +37,8 @@ from server.utils_web import (
     build_prompt_with_skill,
     discover_skills,
     check_all_mcp_servers,
+    fast_hash,
+    http_session,
 )
 from server.utils_lakebase import ProjectDB
 from server.dataclass import (
@@ -87,6 +88,8 @@ def _get_workspace_client() -> WorkspaceClient:
 
 
 db = ProjectDB()
+# Read the SKILL.md files once at startup; /api/skills then serves from the cache
+discover_skills()
 
 # Agent server settings
 AGENT_PORT = os.getenv("AGENT_PORT", "8080")
@@ -240,7 +243,7 @@ async def delete_project(project_id: str):
 async def get_agent_config():
     """Return the current agent config (llm_endpoint, available & enabled MCP servers)."""
     try:
-        resp = requests.get(f"http://0.0.0.0:{AGENT_PORT}/agent-config", timeout=5)
+        resp = http_session.get(f"http://0.0.0.0:{AGENT_PORT}/agent-config", timeout=5)
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -264,7 +267,7 @@ async def get_agent_config():
 async def rebuild_agent(req: RebuildRequest):
     """Trigger an agent rebuild with new LLM and/or MCP selection."""
     try:
-        resp = requests.post(
+        resp = http_session.post(
             f"http://0.0.0.0:{AGENT_PORT}/agent-rebuild",
             json={"llm_endpoint": req.llm_endpoint, "enabled_mcps": req.enabled_mcps},
             timeout=10,
@@ -274,22 +277,31 @@ async def rebuild_agent(req: RebuildRequest):
         return {"ok": False, "detail": str(e)}
 
 
+def _json_with_etag(request: Request, body: bytes) -> Response:
+    """Serve a JSON body with an ETag, answering 304 when the client already has it."""
+    etag = f'"{fast_hash(body)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get("/api/tools")
-async def get_tools():
+async def get_tools(request: Request):
     try:
-        resp = requests.get(f"http://0.0.0.0:{AGENT_PORT}/agent-tools", timeout=5)
+        resp = http_session.get(f"http://0.0.0.0:{AGENT_PORT}/agent-tools", timeout=5)
         if resp.status_code == 200:
-            return resp.json()
+            return _json_with_etag(request, resp.content)
     except Exception:
         pass
     return {}
 
 
 @app.get("/api/skills")
-async def get_skills():
+async def get_skills(request: Request):
     skills = discover_skills()
     sorted_skills = sorted(skills.items(), key=lambda x: x[0].lower())
-    return {name: meta for name, meta in sorted_skills}
+    body = json.dumps({name: meta for name, meta in sorted_skills}).encode()
+    return _json_with_etag(request, body)
 
 
 @app.get("/api/health")
@@ -320,7 +332,7 @@ async def mcp_status():
 @app.get("/api/agent/status")
 async def agent_status():
     try:
-        resp = requests.get(f"http://0.0.0.0:{AGENT_PORT}/agent-status", timeout=5)
+        resp = http_session.get(f"http://0.0.0.0:{AGENT_PORT}/agent-status", timeout=5)
         return resp.json()
     except Exception:
         return {"ready": False, "building": True, "error": None}
@@ -329,7 +341,7 @@ async def agent_status():
 @app.post("/api/agent/warmup")
 async def agent_warmup():
     try:
-        resp = requests.post(f"http://0.0.0.0:{AGENT_PORT}/agent-warmup", timeout=10)
+        resp = http_session.post(f"http://0.0.0.0:{AGENT_PORT}/agent-warmup", timeout=10)
         return resp.json()
     except Exception as e:
         return {"ok": False, "detail": str(e)}
@@ -12,7 +12,8 @@ from __future__ import annotations
 import json
 import os
 import sys
-import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -55,7 +56,8 @@ def stream_prompt(prompt: str) -> StreamResult:
     payload = {
         "input": [{"role": "user", "content": prompt}],
         "custom_inputs": {
-            "thread_id": f"stream-test-{int(time.time())}",
+            # unique per prompt: the checks run concurrently and must not share a thread
+            "thread_id": f"stream-test-{uuid.uuid4().hex}",
             "user_id": "stream-test-user",
         },
     }
@@ -128,9 +130,18 @@ def assert_non_empty_once(prompt: str, forbidden_echo: str | None = None) -> Non
         raise AssertionError(f"{prompt!r} was echoed as assistant text")
 
 
+CHECKS = [
+    ("hello", "hello"),
+    ("What diseases are associated with EGFR?", None),
+]
+
+
 def main() -> int:
-    assert_non_empty_once("hello", forbidden_echo="hello")
-    assert_non_empty_once("What diseases are associated with EGFR?")
+    # Independent prompts on separate threads: wall time is the slowest check, not the sum
+    with ThreadPoolExecutor(max_workers=len(CHECKS)) as pool:
+        futures = [pool.submit(assert_non_empty_once, prompt, echo) for prompt, echo in CHECKS]
+        for future in futures:
+            future.result()
     print("Streaming contract checks passed")
     return 0
 
@@ -21,6 +21,9 @@ CONFIG_PATH = ROOT / "apps" / "react-app" / "config.yml"
 BUNDLE_PATH = ROOT / "databricks.yml"
 
 _SCALAR_RE = re.compile(r'^["\']?(.+?)["\']?$')
+_QUOTED_DEFAULT_RE = re.compile(r'(default:\s*)"([^"]*)"')
+_BARE_DEFAULT_RE = re.compile(r"(default:\s*)(\S+)")
+_HOST_RE = re.compile(r"(host:\s*)(\S+)")
 
 # config.yml lakebase.* keys → databricks.yml variables.*
 LAKEBASE_TO_VAR = {
@@ -120,9 +123,10 @@ def _build_config() -> dict[str, str]:
 
 
 def _replace_default(line: str, cfg_val: str) -> str:
-    line = re.sub(r'(default:\s*)"[^"]*"', rf'\1"{cfg_val}"', line)
+    # callable replacements: config values are inserted verbatim, never parsed as \1-style escapes
+    line = _QUOTED_DEFAULT_RE.sub(lambda m: f'{m.group(1)}"{cfg_val}"', line)
     if '"' not in line.split("default:", 1)[1]:
-        line = re.sub(r"(default:\s*)\S+", rf'\1"{cfg_val}"', line)
+        line = _BARE_DEFAULT_RE.sub(lambda m: f'{m.group(1)}"{cfg_val}"', line)
     return line
 
 
@@ -157,10 +161,8 @@ def sync(*, dry: bool = False) -> list[str]:
         if current_var and current_var in VAR_KEYS and stripped.startswith("default:"):
             cfg_val = config.get(current_var)
             if cfg_val is not None:
-                old_val_match = re.search(r'default:\s*"([^"]*)"', line) or re.search(
-                    r"default:\s*(\S+)", line
-                )
-                old_val = old_val_match.group(1) if old_val_match else ""
+                old_val_match = _QUOTED_DEFAULT_RE.search(line) or _BARE_DEFAULT_RE.search(line)
+                old_val = old_val_match.group(2) if old_val_match else ""
                 if old_val != cfg_val:
                     changes.append(
                         f"  variables.{current_var}.default: {old_val!r} → {cfg_val!r}"
@@ -182,13 +184,13 @@ def sync(*, dry: bool = False) -> list[str]:
         if in_targets and in_workspace and stripped.startswith("host:"):
             cfg_host = config.get("host")
             if cfg_host:
-                old_host_match = re.search(r"host:\s*(\S+)", line)
-                old_host = old_host_match.group(1) if old_host_match else ""
+                old_host_match = _HOST_RE.search(line)
+                old_host = old_host_match.group(2) if old_host_match else ""
                 if old_host != cfg_host:
                     changes.append(
                         f"  targets.*.workspace.host: {old_host!r} → {cfg_host!r}"
                     )
-                    line = re.sub(r"(host:\s*)\S+", rf"\1{cfg_host}", line)
+                    line = _HOST_RE.sub(lambda m: f"{m.group(1)}{cfg_host}", line)
 
         new_lines.append(line)
 
@@ -14,17 +14,11 @@
 
 # COMMAND ----------
 
-# Method 1: Get from secrets
-client_id = dbutils.secrets.get(scope="aichemy", key="client_id")
-client_secret = dbutils.secrets.get(scope="aichemy", key="client_secret")
-
-# COMMAND ----------
-
-# Method 2: Enter into widgets
-dbutils.widgets.text(name="client_id", defaultValue=client_id,  label="Service Principal Client ID")
-dbutils.widgets.text(name="client_secret", defaultValue=client_secret, label="Service Principal Client Secret")
-client_id = dbutils.widgets.get("client_id")
-client_secret = dbutils.widgets.get("client_secret")
+# Enter into widgets, or leave them blank to get from the "aichemy" secret scope
+dbutils.widgets.text(name="client_id", defaultValue="", label="Service Principal Client ID")
+dbutils.widgets.text(name="client_secret", defaultValue="", label="Service Principal Client Secret")
+client_id = dbutils.widgets.get("client_id") or dbutils.secrets.get(scope="aichemy", key="client_id")
+client_secret = dbutils.widgets.get("client_secret") or dbutils.secrets.get(scope="aichemy", key="client_secret")
 
 # COMMAND ----------
 
@@ -82,11 +76,9 @@ dbClient.test_query()
 # MAGIC CREATE OR REPLACE FUNCTION healthcare_lifesciences.qsar.molecule_png_url(cid INTEGER)
 # MAGIC RETURNS STRING
 # MAGIC COMMENT 'Returns the molecule image url of a CID from PubChem'
-# MAGIC LANGUAGE PYTHON
-# MAGIC AS $$
-# MAGIC url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{str(cid)}/png"
-# MAGIC return url
-# MAGIC $$;
+# MAGIC LANGUAGE SQL
+# MAGIC DETERMINISTIC
+# MAGIC RETURN CONCAT('https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/', CAST(cid AS STRING), '/png');
 
 # COMMAND ----------
 
@@ -102,14 +94,18 @@ dbClient.test_query()
 # MAGIC AS $$
 # MAGIC if not smiles or not smiles.strip():
 # MAGIC     return "ERROR: smiles parameter is empty or null"
-# MAGIC from rdkit.Chem import MolFromSmiles
-# MAGIC from rdkit.Chem.AllChem import GetMorganGenerator
+# MAGIC from rdkit.Chem import MolFromSmiles, rdFingerprintGenerator
 # MAGIC mol = MolFromSmiles(smiles.strip())
 # MAGIC if mol is None:
 # MAGIC     return f"ERROR: invalid SMILES string '{smiles}' - RDKit could not parse it"
-# MAGIC fpgen = GetMorganGenerator(radius=2, fpSize=1024)
+# MAGIC # The body runs once per row but the interpreter (and its imported modules) is reused,
+# MAGIC # so keep one generator on the rdkit module instead of building it for every SMILES
+# MAGIC fpgen = getattr(rdFingerprintGenerator, "_ecfp4_1024", None)
+# MAGIC if fpgen is None:
+# MAGIC     fpgen = rdFingerprintGenerator._ecfp4_1024 = rdFingerprintGenerator.GetMorganGenerator(radius=2, fpSize=1024)
 # MAGIC vector = fpgen.GetFingerprintAsNumPy(mol)
-# MAGIC bitstring = "".join([str(i) for i in vector])
+# MAGIC # 0/1 uint8 bytes -> ASCII '0'/'1' in one C-level pass (mirrors the agent's bitstring decoder)
+# MAGIC bitstring = vector.tobytes().translate(bytes.maketrans(b"\x00\x01", b"01")).decode("ascii")
 # MAGIC return bitstring
 # MAGIC $$;
 
@@ -28,7 +28,7 @@ index = client.get_index(index_name=vs_index)
 
 # COMMAND ----------
 
-from descriptors import get_ecfp
+from descriptors import get_ecfp, fpgen, parse_smiles
 import pandas as pd
 import numpy as np
 import rdkit
@@ -38,15 +38,17 @@ from IPython.display import display as idisplay
 
 # test molecule: Furanylfentanyl
 test_smiles = "O=C(C1=CC=CO1)N(C2=CC=CC=C2)C3CCN(CCC4=CC=CC=C4)CC3"
-test_mol = MolFromSmiles(test_smiles)
+test_mol = parse_smiles(test_smiles)
 test_embedding = get_ecfp(test_mol)
 print(test_embedding.tolist())
 
 # COMMAND ----------
 
+# The 1024-float ecfp column is not requested back: hits are reranked from their SMILES below,
+# so returning it would only add ~1024 JSON numbers per hit to every response
 results = index.similarity_search(
     query_vector=test_embedding.tolist(),
-    columns=["zinc_id", "smiles", "mwt", "logp", "ecfp"],
+    columns=["zinc_id", "smiles", "mwt", "logp"],
     num_results=3,
     #filters={"molecular_weight >": 250, "molecular_weight <=": 500}
     )
@@ -59,20 +61,67 @@ columns
 
 # COMMAND ----------
 
-results_df = pd.DataFrame(results['result']['data_array'], columns=columns)
+import pyarrow as pa
+
+# Build columns directly with Arrow rather than a row-by-row pandas constructor
+data_array = results['result']['data_array']
+results_df = pa.Table.from_arrays(
+    [pa.array(list(col)) for col in zip(*data_array)] if data_array else [pa.array([]) for _ in columns],
+    names=columns,
+).to_pandas()
 #results_df['mol'] = results_df["smiles"].apply(MolFromSmiles)
 results_df
 
 # COMMAND ----------
 
+# Rerank hits by Tanimoto similarity with a single C++ bulk call
+from rdkit.Chem import DataStructs
+
+# parse_smiles shares the descriptors parse cache, so the batch queries below reuse these Mols
+hit_fps = fpgen.GetFingerprints([parse_smiles(smi) for smi in results_df["smiles"]])
+results_df["tanimoto"] = DataStructs.BulkTanimotoSimilarity(fpgen.GetFingerprint(test_mol), list(hit_fps))
+results_df = results_df.sort_values("tanimoto", ascending=False, ignore_index=True)
+results_df
+
+# COMMAND ----------
+
 mols2grid.display([test_mol])
 
 # COMMAND ----------
 
+# MAGIC %md
+# MAGIC ### Querying many molecules
+# MAGIC Embed all queries with one batched fingerprint call, then run the searches concurrently instead of one round trip at a time
+
+# COMMAND ----------
+
+from concurrent.futures import ThreadPoolExecutor
+from descriptors import smiles_to_ecfp_batch
+
+query_smiles = [
+    test_smiles,
+    "CC(=O)OC1=CC=CC=C1C(=O)O",  # aspirin
+    "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O",  # ibuprofen
+]
+query_embeddings = smiles_to_ecfp_batch(query_smiles, fpgen)
+
+def search(embedding):
+    return index.similarity_search(
+        query_vector=embedding.tolist(),
+        columns=["zinc_id", "smiles", "mwt", "logp"],
+        num_results=3,
+    )
+
+with ThreadPoolExecutor(max_workers=16) as pool:
+    batch_results = list(pool.map(search, query_embeddings))
+len(batch_results)
+
+# COMMAND ----------
+
 mols2grid.display(
     results_df,
     smiles_col="smiles",
     # set the fields  displayed on the grid
     tooltip=["mwt"],
-    subset=["zinc_id", "score"]
+    subset=["zinc_id", "score", "tanimoto"]
 )
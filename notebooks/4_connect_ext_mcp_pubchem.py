@@ -4,8 +4,28 @@
 
 # COMMAND ----------
 
-# MAGIC %pip install -U databricks-mcp databricks-sdk databricks-langchain mlflow
-# MAGIC %restart_python
+# Skip pip resolution and the Python restart when the packages are already installed;
+# set FORCE_UPGRADE = True to pull the latest versions as `%pip install -U` did on every run
+import importlib.metadata
+import subprocess
+import sys
+
+FORCE_UPGRADE = False
+_packages = ["databricks-mcp", "databricks-sdk", "databricks-langchain", "mlflow"]
+
+
+def _installed(pkg: str) -> bool:
+    try:
+        importlib.metadata.version(pkg)
+        return True
+    except importlib.metadata.PackageNotFoundError:
+        return False
+
+
+_to_install = _packages if FORCE_UPGRADE else [p for p in _packages if not _installed(p)]
+if _to_install:
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "-U", *_to_install])
+    dbutils.library.restartPython()
 
 # COMMAND ----------
 
@@ -26,6 +46,14 @@ ws_client = WorkspaceClient()
 
 # COMMAND ----------
 
+# Key under `uc_connections` in config.yml; rerun Options 2-4 against another server (e.g. pubmed) by changing it
+dbutils.widgets.text(name="mcp_name", defaultValue="pubchem", label="MCP server (uc_connections key)")
+mcp_name = dbutils.widgets.get("mcp_name")
+mcp_conn = cfg.get("uc_connections").get(mcp_name)
+server_url = f'{cfg.get("host")}api/2.0/mcp/external/{mcp_conn}'
+
+# COMMAND ----------
+
 pubchem_api = dbutils.secrets.get(scope="aichemy", key="pubchem_glama_api")
 
 # COMMAND ----------
@@ -135,8 +163,33 @@ os.environ["pubchem_glama_api"] = pubchem_api
 from databricks.sdk.service.serving import ExternalFunctionRequestHttpMethod
 from pprint import pprint
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+def _sse_data(event: bytes) -> bytes:
+    return b"\n".join(line[5:].lstrip() for line in event.split(b"\n") if line.startswith(b"data:"))
+
+
+def iter_jsonrpc_messages(stream):
+    """Yield JSON-RPC messages from an SSE (or plain JSON) byte stream as each event arrives."""
+    buf = b""
+    for chunk in stream:
+        buf += chunk.replace(b"\r\n", b"\n")
+        while b"\n\n" in buf:
+            event, buf = buf.split(b"\n\n", 1)
+            data = _sse_data(event)
+            if data:
+                yield json_loads(data)
+    # Plain application/json reply, or a last event without the trailing blank line
+    if buf.strip():
+        yield json_loads(_sse_data(buf) or buf)
+
+
 response = ws_client.serving_endpoints.http_request(
-  conn=cfg.get("uc_connections").get("pubchem"),
+  conn=mcp_conn,
   method=ExternalFunctionRequestHttpMethod.POST,
   path="",
   json={"jsonrpc": "2.0", "method": "tools/list", "params": {}, "id": 2},
@@ -144,7 +197,10 @@ response = ws_client.serving_endpoints.http_request(
     "Accept": "application/json, text/event-stream",
     "Mcp-Session-Id": "81992b9a-d0d4-4b57-81c0-5911ee817acf"}\
 )
-pprint(response.__dict__)
+# contents is a streaming body: handle each SSE event as it arrives instead of buffering the reply
+with response.contents as stream:
+    for message in iter_jsonrpc_messages(stream):
+        pprint(message)
 
 # COMMAND ----------
 
@@ -158,25 +214,24 @@ import asyncio
 
 mcp_client = DatabricksMultiServerMCPClient([
     DatabricksMCPServer(
-        name="pubchem",
-        url=f'{cfg.get("host")}api/2.0/mcp/external/{cfg.get("uc_connections").get("pubchem")}',
+        name=mcp_name,
+        url=server_url,
     )
 ])
-await mcp_client.get_tools()
 
 # COMMAND ----------
 
-server_name = None
-server_names = [server_name] if server_name is not None else list(mcp_client.connections.keys())
-print(server_names)
-load_tool_tasks = [
-    asyncio.create_task(
-        super(DatabricksMultiServerMCPClient, mcp_client).get_tools(server_name=name)
+async def load_all_tools(client: DatabricksMultiServerMCPClient) -> dict:
+    """Load tools from every server concurrently; a failing server returns its exception."""
+    server_names = list(client.connections.keys())
+    tools_list = await asyncio.gather(
+        *[super(DatabricksMultiServerMCPClient, client).get_tools(server_name=name) for name in server_names],
+        return_exceptions=True,
     )
-    for name in server_names
-]
-tools_list = await asyncio.gather(*load_tool_tasks,  return_exceptions=True)
-tools_list
+    return dict(zip(server_names, tools_list))
+
+tools_by_server = await load_all_tools(mcp_client)
+tools_by_server
 
 # COMMAND ----------
 
@@ -188,15 +243,20 @@ tools_list
 
 # Use the patched DatabricksMCPClient to disable zstd decoding
 # from databricks_mcp import DatabricksMCPClient
-from src.databricks_mcp_client import DatabricksMCPClient
-import nest_asyncio
+from src.databricks_mcp_client import get_mcp_client
 
-nest_asyncio.apply()
-
-server_url = f'{cfg.get("host")}api/2.0/mcp/external/{cfg.get("uc_connections").get("pubchem")}'
-mcp_client = DatabricksMCPClient(server_url=server_url, workspace_client=ws_client)
+# Cached per (server_url, ws_client): re-running this cell keeps the listed tools
+mcp_client = get_mcp_client(server_url, workspace_client=ws_client)
 mcp_client.list_tools(timeout=60, terminate_on_close=False)
 
 # COMMAND ----------
 
 mcp_client.call_tool("search_compounds", {"query": "aspirin"}, terminate_on_close=False)
+
+# COMMAND ----------
+
+# Reuse one session (single TLS handshake + initialize) for several tool calls
+async with mcp_client.session(timeout=60, terminate_on_close=False) as session:
+    for query in ["aspirin", "ibuprofen", "caffeine"]:
+        result = await session.call_tool("search_compounds", {"query": query})
+        print(query, result.content)
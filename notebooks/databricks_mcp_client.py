@@ -1,16 +1,24 @@
 import asyncio
+import hashlib
 import json
 import logging
+import os
 import re
+import threading
+import time
+from contextlib import asynccontextmanager
 from functools import wraps
-from typing import Any, Callable, List, Optional
+from typing import Any, AsyncIterator, Callable, List, Optional
 from urllib.parse import urlparse
 
+import anyio
+import httpx
 import requests
 from databricks.sdk import WorkspaceClient
 from databricks_ai_bridge.utils.annotations import experimental
 from mcp.client.session import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
 from mcp.types import CallToolResult, Tool
 from mlflow.models.resources import (
     DatabricksFunction,
@@ -21,8 +29,23 @@ from mlflow.models.resources import (
 
 from databricks_mcp.oauth_provider import DatabricksOAuthClientProvider
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 logger = logging.getLogger(__name__)
 
+# The session's streams are closed or the server can't be reached: the call was
+# never sent, so reconnecting and re-issuing it is safe
+_SESSION_DROPPED_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, httpx.ConnectError)
+
 # MCP URL types
 UC_FUNCTIONS_MCP = "uc_functions_mcp"
 VECTOR_SEARCH_MCP = "vector_search_mcp"
@@ -34,6 +57,24 @@ MCP_URL_PATTERNS = {
     GENIE_MCP: r"^/api/2\.0/mcp/genie/[^/]+$",
 }
 
+# Negotiated once for every session: MCP JSON-RPC payloads are small, so
+# skip zstd (the streaming decoder chokes on it) and keep gzip for large lists.
+MCP_DEFAULT_HEADERS = {"Accept-Encoding": "gzip, identity"}
+
+# On-disk tools/list cache so a restarted kernel skips the round-trip.
+TOOLS_CACHE_DIR = "/tmp/mcp_tools_cache"
+TOOLS_CACHE_TTL = 3600
+
+# Persistent loop on a daemon thread. Notebooks already run an event loop, so
+# asyncio.run() would need nest_asyncio; submitting here avoids that.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, daemon=True, name="mcp-client-loop").start()
+
+
+def _run_sync(coro):
+    """Run *coro* on the background loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
 
 def _handle_mcp_errors(func: Callable) -> Callable:
     """Decorator to handle MCP connection errors for sync wrapper methods."""
@@ -54,7 +95,7 @@ def _handle_mcp_errors(func: Callable) -> Callable:
                 "Accept": "application/json, text/event-stream",
                 "Authorization": f"Bearer {token}",
             }
-            payload = json.dumps(
+            payload = _json_dumps(
                 {
                     "jsonrpc": "2.0",
                     "method": "initialize",
@@ -124,6 +165,11 @@ class DatabricksMCPClient:
     ):
         self.client = workspace_client or WorkspaceClient()
         self.server_url = server_url
+        self._tools: Optional[List[Tool]] = None
+        # Long-lived session used by call_tool, owned by a task on the background loop
+        self._session: Optional[ClientSession] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_done: Optional[asyncio.Event] = None
 
     def _get_databricks_managed_mcp_url_type(self) -> str:
         """Determine the MCP URL type based on the path."""
@@ -134,31 +180,138 @@ class DatabricksMCPClient:
 
         return None
 
-    async def _get_tools_async(self, **kwargs) -> List[Tool]:
-        """Fetch tools from the MCP endpoint asynchronously."""
+    @asynccontextmanager
+    async def session(self, **kwargs) -> AsyncIterator[ClientSession]:
+        """Open one initialized MCP session that can be reused for many calls."""
+        headers = {**MCP_DEFAULT_HEADERS, **kwargs.pop("headers", {})}
         async with streamablehttp_client(
             url=self.server_url,
             auth=DatabricksOAuthClientProvider(self.client),
-            headers={"Accept-Encoding": "identity"},
+            headers=headers,
             **kwargs,
         ) as (read_stream, write_stream, _):
             async with ClientSession(read_stream, write_stream) as session:
                 await session.initialize()
-                return (await session.list_tools()).tools
+                yield session
+
+    async def _get_tools_async(
+        self, session: Optional[ClientSession] = None, **kwargs
+    ) -> List[Tool]:
+        """Fetch tools from the MCP endpoint asynchronously."""
+        if session is not None:
+            return (await session.list_tools()).tools
+        async with self.session(**kwargs) as session:
+            return (await session.list_tools()).tools
 
     async def _call_tools_async(
-        self, tool_name: str, arguments: dict[str, Any] | None = None, **kwargs
+        self,
+        tool_name: str,
+        arguments: dict[str, Any] | None = None,
+        session: Optional[ClientSession] = None,
+        **kwargs,
     ) -> CallToolResult:
         """Call the tool with the given name and input."""
-        async with streamablehttp_client(
-            url=self.server_url,
-            auth=DatabricksOAuthClientProvider(self.client),
-            headers={"Accept-Encoding": "identity"},
-            **kwargs,
-        ) as (read_stream, write_stream, _):
-            async with ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
+        if session is not None:
+            return await session.call_tool(tool_name, arguments)
+        async with self.session(**kwargs) as session:
+            return await session.call_tool(tool_name, arguments)
+
+    async def _open_persistent_session(self, **kwargs) -> ClientSession:
+        """Open a session held open by its own task until `_close_persistent_session`.
+
+        The transport's cancel scopes must be exited by the task that entered
+        them, so a holder task keeps the `session()` context open and other
+        tasks only borrow the session object.
+        """
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        done = asyncio.Event()
+
+        async def _hold():
+            try:
+                async with self.session(**kwargs) as session:
+                    ready.set_result(session)
+                    await done.wait()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                else:
+                    logger.debug(f"Persistent MCP session to {self.server_url} ended: {e}")
+
+        self._session_done = done
+        self._session_task = loop.create_task(_hold())
+        self._session = await ready
+        return self._session
+
+    async def _close_persistent_session(self) -> None:
+        session_task, self._session, self._session_task = self._session_task, None, None
+        if self._session_done is not None:
+            self._session_done.set()
+        if session_task is not None:
+            await asyncio.gather(session_task, return_exceptions=True)
+
+    async def _call_tool_persistent(
+        self, tool_name: str, arguments: dict[str, Any] | None = None, **kwargs
+    ) -> CallToolResult:
+        """Call a tool on the long-lived session, reconnecting once if it has dropped.
+
+        Only errors raised before the request reaches the server are retried; after
+        that (e.g. a read timeout) the tool may already have run, so it is not re-issued.
+        """
+        for attempt in range(2):
+            session = self._session or await self._open_persistent_session(**kwargs)
+            try:
                 return await session.call_tool(tool_name, arguments)
+            except McpError:
+                # a JSON-RPC error from the server; the session itself is fine
+                raise
+            except _SESSION_DROPPED_ERRORS:
+                await self._close_persistent_session()
+                if attempt:
+                    raise
+            except Exception:
+                # the session may be mid-response; drop it but don't re-issue the call
+                await self._close_persistent_session()
+                raise
+
+    def close(self) -> None:
+        """Close the long-lived session used by `call_tool`, if open."""
+        _run_sync(self._close_persistent_session())
+
+    def _tools_cache_path(self) -> str:
+        """Path of the on-disk tools/list cache for this server URL."""
+        digest = hashlib.sha256(self.server_url.encode()).hexdigest()
+        return os.path.join(TOOLS_CACHE_DIR, f"{digest}.json")
+
+    def _read_tools_cache(self) -> Optional[List[Tool]]:
+        """Return cached tools if the cache file exists and is within the TTL."""
+        path = self._tools_cache_path()
+        try:
+            if time.time() - os.path.getmtime(path) > TOOLS_CACHE_TTL:
+                return None
+            with open(path, "rb") as f:
+                return [Tool.model_validate(t) for t in _json_loads(f.read())]
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable MCP tools cache {path}: {e}")
+            return None
+
+    def _write_tools_cache(self, tools: List[Tool]) -> None:
+        path = self._tools_cache_path()
+        try:
+            os.makedirs(TOOLS_CACHE_DIR, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(_json_dumps([t.model_dump(mode="json") for t in tools]))
+        except OSError as e:
+            logger.warning(f"Could not write MCP tools cache {path}: {e}")
+
+    def invalidate_tools_cache(self) -> None:
+        """Drop the in-memory and on-disk tools/list cache for this server."""
+        self._tools = None
+        try:
+            os.remove(self._tools_cache_path())
+        except FileNotFoundError:
+            pass
 
     def _extract_genie_id(self) -> str:
         """Extract the Genie space ID from the URL."""
@@ -175,14 +328,21 @@ class DatabricksMCPClient:
         return name.replace("__", ".")
 
     @_handle_mcp_errors
-    def list_tools(self, **kwargs) -> List[Tool]:
+    def list_tools(self, refresh: bool = False, **kwargs) -> List[Tool]:
         """
         Lists the tools for the current MCP Server. This method uses the `streamablehttp_client` from mcp to fetch all the tools from the MCP server.
+        The result is cached on the client and on disk (see `TOOLS_CACHE_TTL`); pass
+        `refresh=True` to fetch it again.
 
         Returns:
             List[mcp.types.Tool]: A list of tools for the current MCP Server.
         """
-        return asyncio.run(self._get_tools_async(**kwargs))
+        if self._tools is None and not refresh:
+            self._tools = self._read_tools_cache()
+        if self._tools is None or refresh:
+            self._tools = _run_sync(self._get_tools_async(**kwargs))
+            self._write_tools_cache(self._tools)
+        return self._tools
 
     @_handle_mcp_errors
     def call_tool(
@@ -190,6 +350,9 @@ class DatabricksMCPClient:
     ) -> CallToolResult:
         """
         Calls the tool with the given name and input. This method uses the `streamablehttp_client` from mcp to call the tool.
+        Calls share one long-lived session (opened with the first call's kwargs) instead of
+        reconnecting and re-initializing per call; it is reopened once if it has dropped.
+        Call `close()` to end it.
 
         Args:
             tool_name (str): The name of the tool to call.
@@ -198,7 +361,7 @@ class DatabricksMCPClient:
         Returns:
             mcp.types.CallToolResult: The result of the tool call.
         """
-        return asyncio.run(self._call_tools_async(tool_name, arguments, **kwargs))
+        return _run_sync(self._call_tool_persistent(tool_name, arguments, **kwargs))
 
     def get_databricks_resources(self) -> List[DatabricksResource]:
         """
@@ -238,4 +401,24 @@ class DatabricksMCPClient:
 
         except Exception as e:
             logger.error(f"Error retrieving Databricks resources: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+# One client per (server_url, workspace client), so re-running a cell or
+# building several tools against the same server reuses its tools/list cache
+_MCP_CLIENT_CACHE: dict[tuple[str, int], DatabricksMCPClient] = {}
+_MCP_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def get_mcp_client(
+    server_url: str, workspace_client: Optional[WorkspaceClient] = None
+) -> DatabricksMCPClient:
+    """Return the cached `DatabricksMCPClient` for this server URL and workspace client."""
+    key = (server_url, id(workspace_client))
+    with _MCP_CLIENT_CACHE_LOCK:
+        client = _MCP_CLIENT_CACHE.get(key)
+        if client is None:
+            client = _MCP_CLIENT_CACHE[key] = DatabricksMCPClient(
+                server_url=server_url, workspace_client=workspace_client
+            )
+        return client
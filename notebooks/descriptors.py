@@ -1,43 +1,163 @@
 import pandas as pd
 import numpy as np
 import rdkit
-from rdkit.Chem import Descriptors, MolFromSmiles, AllChem, DataStructs
+from rdkit.Chem import Descriptors, MolFromSmiles, AllChem, DataStructs, rdMolDescriptors
 from rdkit.Chem.rdchem import Mol
 from pyspark.sql.functions import pandas_udf
-from pyspark.sql.types import StructType, StructField, StringType, DoubleType, ArrayType, FloatType
-from typing import Dict, Iterator, List, Optional
+from pyspark.sql.types import StructType, StructField, StringType, DoubleType, ArrayType, FloatType, ByteType
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import re
+import os
+import multiprocessing
+from functools import lru_cache, partial
 
 
-fpgen = AllChem.GetMorganGenerator(radius=2, fpSize=1024)
+# One generator per (radius, fpSize) for the lifetime of each Python worker
+@lru_cache(maxsize=None)
+def get_fpgen(radius: int=2, fpSize: int=1024) -> rdkit.Chem.rdFingerprintGenerator.FingerprintGenerator64:
+    return AllChem.GetMorganGenerator(radius=radius, fpSize=fpSize)
+
+
+fpgen = get_fpgen()
 
 # # https://datagrok.ai/help/datagrok/solutions/domains/chem/descriptors
+_UNSELECT_RE = re.compile(r"^Max|^Min|^MolWt$|^FpDensityMorgan|^BCUT2D|Ipc$|AvgIpc|BalabanJ|BertzCT|^Chi|^Kappa|LabuteASA|^PEOE_|^SMR_|^SlogP_|EState|VSA_EState|MolLogP|MolMR|HallKier|qed|TPSA|NumHAcceptors|NumHDonors")
+
+# descList is fixed for the process, so filter it once
+@lru_cache(maxsize=1)
+def _selected_descriptors() -> Tuple[str, ...]:
+    return tuple(d for d, _ in Descriptors.descList if not _UNSELECT_RE.match(d))
+
 def get_selected_descriptors() -> List[str]:
-    from rdkit.Chem import Descriptors
+    return list(_selected_descriptors())
+
 
-    desc = [desc for desc, _ in Descriptors.descList]
-    unselect_regex = re.compile(r"^Max|^Min|^MolWt$|^FpDensityMorgan|^BCUT2D|Ipc$|AvgIpc|BalabanJ|BertzCT|^Chi|^Kappa|LabuteASA|^PEOE_|^SMR_|^SlogP_|EState|VSA_EState|MolLogP|MolMR|HallKier|qed|TPSA|NumHAcceptors|NumHDonors")
-    selected_desc = [d for d in desc if not unselect_regex.match(d)]
-    return selected_desc
+# Small per-worker parse cache for interactive reuse (e.g. query SMILES and their hits);
+# Mols are only read downstream. Table featurization parses uncached: its SMILES are
+# unique per row, so caching there would only hold memory in every worker process
+@lru_cache(maxsize=10_000)
+def parse_smiles(smiles: str) -> Optional[Mol]:
+    return MolFromSmiles(smiles)
 
 
 # For a single molecule
 def get_ecfp(mol: rdkit.Chem.rdchem.Mol, radius: int=2, fpSize: int=1024) -> np.array:
-    fpgen = AllChem.GetMorganGenerator(radius=radius, fpSize=fpSize)
-    return fpgen.GetFingerprintAsNumPy(mol)
+    return get_fpgen(radius, fpSize).GetFingerprintAsNumPy(mol)
 
 # For a single smiles
-def smiles_to_ecfp(smiles: str, fpgen: rdkit.Chem.rdFingerprintGenerator.FingerprintGenerator64) -> np.array:
-    from rdkit.Chem import MolFromSmiles
-    mol = MolFromSmiles(smiles)
+def smiles_to_ecfp(smiles: str, fpgen: rdkit.Chem.rdFingerprintGenerator.FingerprintGenerator64=fpgen) -> np.array:
+    mol = parse_smiles(smiles)
     return fpgen.GetFingerprintAsNumPy(mol)
 
+# For a batch of mols: one C++ GetFingerprints call instead of one call per row
+def mols_to_ecfp_batch(mols: List[Optional[Mol]], fpgen: rdkit.Chem.rdFingerprintGenerator.FingerprintGenerator64) -> np.array:
+    fps = fpgen.GetFingerprints(mols)
+    # unparseable smiles give a None fingerprint and keep an all-zero row
+    arr = np.zeros((len(fps), fpgen.GetOptions().fpSize), dtype=np.uint8)
+    for i, fp in enumerate(fps):
+        if fp is not None:
+            DataStructs.ConvertToNumpyArray(fp, arr[i])
+    return arr
+
+def smiles_to_ecfp_batch(smiles: Iterable[str], fpgen: rdkit.Chem.rdFingerprintGenerator.FingerprintGenerator64) -> np.array:
+    return mols_to_ecfp_batch([parse_smiles(smi) for smi in smiles], fpgen)
+
+# 1024 bits <-> 128 bytes, for storing ECFP compactly (e.g. BinaryType columns)
+def pack_ecfp(ecfp: np.array) -> bytes:
+    return np.packbits(ecfp).tobytes()
+
+def unpack_ecfp(packed: bytes, fpSize: int=1024) -> np.array:
+    return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=fpSize)
+
+# Bits set per byte; np.bitwise_count (NumPy >= 2) does the same with a popcount instruction
+_POPCOUNT8 = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+def _popcount_rows(packed: np.array) -> np.array:
+    if hasattr(np, "bitwise_count"):
+        if packed.shape[-1] % 8 == 0:
+            packed = packed.view(np.uint64)
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[packed].sum(axis=-1, dtype=np.int64)
+
+# Tanimoto of one packed ECFP against many (n, 128) without unpacking to bits
+def tanimoto_packed(query: np.array, packed: np.array) -> np.array:
+    query = np.ascontiguousarray(query, dtype=np.uint8)
+    packed = np.ascontiguousarray(np.atleast_2d(packed), dtype=np.uint8)
+    inter = _popcount_rows(packed & query)
+    union = _popcount_rows(packed | query)
+    return np.divide(inter, union, out=np.zeros(len(packed), dtype=np.float32), where=union > 0)
+
+# Spark column of packed ECFP (128 signed bytes per 1024-bit fingerprint, ByteType is int8);
+# one bulk fingerprint call and one packbits per Arrow batch
+@pandas_udf(ArrayType(ByteType()))
+def ecfp_packed_udf(batches: Iterator[pd.Series]) -> Iterator[pd.Series]:
+    for smiles in batches:
+        ecfp = smiles_to_ecfp_batch(smiles.tolist(), fpgen)
+        yield pd.Series(list(np.packbits(ecfp, axis=1).view(np.int8)))
+
+# Properties calculators are built once per descriptor selection, not per row
+@lru_cache(maxsize=8)
+def _calculator(desc: Tuple[str, ...]) -> rdMolDescriptors.Properties:
+    return rdMolDescriptors.Properties(list(desc))
+
 def smiles_to_desc(smiles: str, desc: Optional[List[str]] = None):
-    from rdkit.Chem import Descriptors, MolFromSmiles
-    mol = MolFromSmiles(smiles)
-    # desc option does not work
+    mol = parse_smiles(smiles)
+    # desc takes rdMolDescriptors.Properties names (e.g. "exactmw", "NumRings"), not descList names
     if desc:
-        calculator = Descriptors.Properties(desc)
-        return calculator.CalcDescriptors(mol)
+        return _calculator(tuple(desc)).ComputeProperties(mol)
     else: #all descriptors
         return Descriptors.CalcMolDescriptors(mol)
+
+# For a batch of mols: run each descriptor over the whole batch
+def mols_to_desc_batch(mols: List[Optional[Mol]]) -> pd.DataFrame:
+    out = np.full((len(mols), len(Descriptors.descList)), np.nan, dtype=np.float32)
+    for j, (_, fn) in enumerate(Descriptors.descList):
+        col = out[:, j]
+        for i, mol in enumerate(mols):
+            if mol is None:
+                continue
+            # same as CalcMolDescriptors: a failing descriptor becomes missing
+            try:
+                col[i] = fn(mol)
+            except Exception:
+                pass
+    return pd.DataFrame(out, columns=[name for name, _ in Descriptors.descList])
+
+def smiles_to_desc_batch(smiles: Iterable[str]) -> pd.DataFrame:
+    return mols_to_desc_batch([MolFromSmiles(smi) for smi in smiles])
+
+# ECFP + descriptors for one chunk, parsed once; runs inside pool workers so
+# only SMILES strings and numpy/pandas results cross the process boundary
+def _features_chunk(smiles: List[str]) -> Tuple[np.array, pd.DataFrame]:
+    mols = [MolFromSmiles(smi) for smi in smiles]
+    return mols_to_ecfp_batch(mols, fpgen), mols_to_desc_batch(mols)
+
+_pool = None
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = multiprocessing.get_context("fork").Pool(min(4, os.cpu_count() or 1))
+    return _pool
+
+# For a batch of smiles: fan chunks out to a per-worker process pool
+def smiles_to_features_batch(smiles: Sequence[str], chunksize: int=256) -> Tuple[np.array, pd.DataFrame]:
+    smiles = list(smiles)
+    if len(smiles) <= chunksize:
+        return _features_chunk(smiles)
+    chunks = [smiles[i:i + chunksize] for i in range(0, len(smiles), chunksize)]
+    results = _get_pool().map(_features_chunk, chunks)
+    ecfp = np.concatenate([e for e, _ in results])
+    desc = pd.concat([d for _, d in results], ignore_index=True)
+    return ecfp, desc
+
+def _ecfp_chunk(smiles: List[str], radius: int=2, fpSize: int=1024) -> np.array:
+    return smiles_to_ecfp_batch(smiles, get_fpgen(radius, fpSize))
+
+# ECFP only, for a large batch of smiles: same worker pool, one generator per worker
+def smiles_to_ecfp_parallel(smiles: Sequence[str], radius: int=2, fpSize: int=1024, chunksize: int=1024) -> np.array:
+    smiles = list(smiles)
+    if len(smiles) <= chunksize:
+        return _ecfp_chunk(smiles, radius, fpSize)
+    chunks = [smiles[i:i + chunksize] for i in range(0, len(smiles), chunksize)]
+    return np.concatenate(_get_pool().map(partial(_ecfp_chunk, radius=radius, fpSize=fpSize), chunks))
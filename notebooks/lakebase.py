@@ -1,8 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
 from databricks.sdk import WorkspaceClient
+from functools import lru_cache
+import logging
 import psycopg
+import threading
+import time
 from psycopg_pool import ConnectionPool
+from typing import Optional, Sequence
 from uuid import uuid4
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _default_ws() -> WorkspaceClient:
+    # Built on first use, not at import, and only when the caller passes no client
+    return WorkspaceClient()
+
+
+# Shared by all LakebaseConnect objects for their startup SDK lookups
+_sdk_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lakebase-sdk")
+
 
 class LakebaseConnect:
     """A class to manage database connections to Lakebase Autoscaling.
@@ -25,7 +43,12 @@ class LakebaseConnect:
         database: str = "databricks_postgres",
         password: str = None,
         port: int = 5432,
-        wsClient: WorkspaceClient = WorkspaceClient(),
+        wsClient: Optional[WorkspaceClient] = None,
+        pool_min_size: int = 4,
+        pool_max_size: int = 32,
+        pool_max_idle: float = 600.0,
+        pool_max_lifetime: float = 3300.0,
+        pool_timeout: float = 30.0,
     ):
         """
         Initialize the Lakebase Autoscaling connection.
@@ -38,7 +61,13 @@ class LakebaseConnect:
             database: Database name (default: "databricks_postgres")
             password: Pre-existing password/token (optional; auto-generated if None)
             port: Port number for the connection (default: 5432)
-            wsClient: Authenticated WorkspaceClient instance
+            wsClient: Authenticated WorkspaceClient instance (default: a shared WorkspaceClient())
+            pool_min_size: Connections kept open in the pool (default: 4)
+            pool_max_size: Upper bound on pool connections (default: 32)
+            pool_max_idle: Seconds an idle connection above min_size is kept (default: 600)
+            pool_max_lifetime: Seconds before a connection is replaced; under the 1h token
+                expiry so connections rotate before their credential lapses (default: 3300)
+            pool_timeout: Seconds to wait for a free connection (default: 30)
         """
         self.instance_name = instance_name
         self.endpoint_id = endpoint_id
@@ -50,47 +79,81 @@ class LakebaseConnect:
         self.password = password
         self.connection_pool = None
         self.url = None
-        self.w = wsClient
-
-        print(
-            f"WorkspaceClient initialized with user {self.w.current_user.me().user_name}"
-        )
+        self.w = wsClient or _default_ws()
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_max_idle = pool_max_idle
+        self.pool_max_lifetime = pool_max_lifetime
+        self.pool_timeout = pool_timeout
+        self._token = None
+        self._token_expiry = 0.0
+        self._token_lock = threading.Lock()
 
         if self.instance_name and self.endpoint_id:
-            print(f"instance_name {self.instance_name} and endpoint_id {self.endpoint_id} cannot be both specified at the same time. Connect by either instance_name or endpoint_name, not both. To connect with both, initialize LakebaseConnect again")
+            logger.warning(f"instance_name {self.instance_name} and endpoint_id {self.endpoint_id} cannot be both specified at the same time. Connect by either instance_name or endpoint_name, not both. To connect with both, initialize LakebaseConnect again")
 
         if self.endpoint_id:
             if not self.project_id or not self.branch_id:
                 raise ValueError(
                     "endpoint_id requires project_id and branch_id to also be specified"
                 )
-        
-        if self.instance_name:
-            instance = self.w.database.get_database_instance(name=self.instance_name)
-            self.host = instance.read_write_dns
-            print(f"Lakebase instance: {self.instance_name} -> {self.host}")
 
+        # The identity check and host lookup are independent SDK round-trips; overlap them
+        # (and those of other LakebaseConnect objects built at the same time).
+        # The identity is only logged, so skip that call unless debug logging is on
+        me_fut = None
+        if logger.isEnabledFor(logging.DEBUG):
+            me_fut = _sdk_executor.submit(self.w.current_user.me)
+        host_fut = _sdk_executor.submit(self._resolve_host)
+
+        if me_fut is not None:
+            logger.debug("WorkspaceClient initialized with user %s", me_fut.result().user_name)
+        self.host, endpoint_name = host_fut.result()
+        if endpoint_name:
+            self.endpoint_name = endpoint_name
+            logger.debug("Lakebase endpoint: %s -> %s", self.endpoint_name, self.host)
+        elif self.instance_name:
+            logger.debug("Lakebase instance: %s -> %s", self.instance_name, self.host)
+
+    def _resolve_host(self) -> tuple:
+        """Return (host, endpoint_name), endpoint_name being None for an instance."""
         if self.endpoint_id and self.project_id and self.branch_id:
-            self.endpoint_name = (
-                f"projects/{project_id}/branches/{branch_id}/endpoints/{endpoint_id}"
+            endpoint_name = (
+                f"projects/{self.project_id}/branches/{self.branch_id}/endpoints/{self.endpoint_id}"
             )
             # Resolve endpoint host via Lakebase Autoscaling API
-            endpoint = self.w.postgres.get_endpoint(name=self.endpoint_name)
-            self.host = endpoint.status.hosts.host
-            print(f"Lakebase endpoint: {self.endpoint_name} -> {self.host}")
+            endpoint = self.w.postgres.get_endpoint(name=endpoint_name)
+            return endpoint.status.hosts.host, endpoint_name
+        if self.instance_name:
+            instance = self.w.database.get_database_instance(name=self.instance_name)
+            return instance.read_write_dns, None
+        return None, None
+
+    # Tokens live 1h; refresh this many seconds before expiry
+    TOKEN_TTL = 3600
+    TOKEN_REFRESH_SKEW = 300
 
     def _generate_token(self) -> str:
-        """Generate an ephemeral OAuth token (1h expiry) for the endpoint."""
-        cred = None
-        if self.instance_name:
-            cred = self.w.database.generate_database_credential(
-                request_id=str(uuid4()), instance_names=[self.instance_name]
-            )
-        if self.endpoint_id:
-            cred = self.w.postgres.generate_database_credential(
-                endpoint=self.endpoint_name
-            )
-        return cred
+        """Return an ephemeral OAuth token (1h expiry) for the endpoint.
+
+        The token is cached and only regenerated within TOKEN_REFRESH_SKEW of
+        expiry, so new pool connections don't each cost an SDK round-trip.
+        """
+        with self._token_lock:
+            if self._token and time.monotonic() < self._token_expiry - self.TOKEN_REFRESH_SKEW:
+                return self._token
+            cred = None
+            if self.instance_name:
+                cred = self.w.database.generate_database_credential(
+                    request_id=str(uuid4()), instance_names=[self.instance_name]
+                )
+            if self.endpoint_id:
+                cred = self.w.postgres.generate_database_credential(
+                    endpoint=self.endpoint_name
+                )
+            self._token = cred.token
+            self._token_expiry = time.monotonic() + self.TOKEN_TTL
+            return self._token
 
     def _connect(self):
         """Set up the database connection with token auto-refresh via connection pool.
@@ -98,8 +161,9 @@ class LakebaseConnect:
         Uses a custom psycopg Connection class that generates a fresh OAuth token
         for each new connection from the pool, ensuring tokens never expire mid-session.
         """
-        if self.password is None:
-            self.password = self._generate_token().token
+        # A generated token is re-read from the cache so a reconnect never reuses an expired one
+        if self.password is None or self.password == self._token:
+            self.password = self._generate_token()
 
         self.url = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}?sslmode=require"
         self.conninfo = f"dbname={self.database} user={self.user} password={self.password} host={self.host} sslmode=require"
@@ -110,37 +174,51 @@ class LakebaseConnect:
         class AutoRefreshConnection(psycopg.Connection):
             @classmethod
             def connect(cls, conninfo=lakebase_ref.conninfo, **kwargs):
-                # Generate a fresh OAuth token for each new connection
+                # Cached OAuth token, regenerated near expiry, so rotated connections never carry a stale one
                 kwargs["password"] = lakebase_ref._generate_token()
                 return super().connect(conninfo, **kwargs)
 
         self.connection_pool = ConnectionPool(
             conninfo=self.conninfo,
-            #TODO
-#            connection_class=AutoRefreshConnection,
-            kwargs={"autocommit": True},
-            min_size=1,
-            max_size=10,
+            # a caller-supplied password is used as is; a generated one is refreshed per connection
+            connection_class=AutoRefreshConnection if self.password == self._token else psycopg.Connection,
+            # prepare server-side on the first repeat of a statement instead of the fifth
+            kwargs={"autocommit": True, "prepare_threshold": 1},
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            max_idle=self.pool_max_idle,
+            max_lifetime=self.pool_max_lifetime,
+            timeout=self.pool_timeout,
+            # open the initial connections in parallel
+            num_workers=2,
             open=True,
         )
 
-    def query(self, query: str):
+    def ensure_connected(self):
+        """Open the connection pool on first use and reuse it afterwards."""
+        if self.connection_pool is None or self.connection_pool.closed:
+            self._connect()
+        return self.connection_pool
+
+    def query(self, query: str, params: Optional[Sequence] = None, prepare: Optional[bool] = None):
         """
         Execute a SQL query against the database.
 
         Args:
-            query: SQL query string to execute
+            query: SQL query string to execute. Pass values as %s placeholders with params,
+                not formatted into the string, so repeated queries share one prepared statement
+            params: Values bound to the %s placeholders (optional; without it the query is
+                sent as is, so a literal % needs no escaping)
+            prepare: True/False forces/disables a server-side prepared statement; None
+                (default) leaves it to the pool, which prepares a statement on its first repeat
 
         Returns:
             Query result
         """
-        if self.connection_pool is None:
-            raise RuntimeError(
-                "Database connection not initialized. Call _connect() first."
-            )
+        self.ensure_connected()
 
         with self.connection_pool.connection() as conn:
-            result = conn.execute(query)
+            result = conn.execute(query, params, prepare=prepare)
             return result.fetchall()
 
     def close(self):
@@ -150,13 +228,11 @@ class LakebaseConnect:
             self.connection_pool = None
 
     def test_query(self):
+        """Run a trivial query; the pool stays open for later queries (call close() when done)."""
         query = "SELECT version()"
-        self._connect()
         try:
             result = self.query(query)
             print(f"Successfully queried Lakebase with result: {result}")
             return result
         except Exception as e:
-            print(f"Error: {e}")
-        finally:
-            self.close()
\ No newline at end of file
+            print(f"Error: {e}")
\ No newline at end of file